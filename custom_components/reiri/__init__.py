@@ -7,9 +7,18 @@ from homeassistant.core import HomeAssistant
 from homeassistant.exceptions import ConfigEntryNotReady
 
 from homeassistant.helpers import device_registry as dr
-from .const import DOMAIN, CONF_IP_ADDRESS, CONF_USERNAME, CONF_PASSWORD, DEFAULT_PORT
+from .const import (
+    DOMAIN,
+    CONF_DUAL_CHANNEL,
+    CONF_IP_ADDRESS,
+    CONF_USERNAME,
+    CONF_PASSWORD,
+    DEFAULT_PORT,
+    FLOW_CLIENTS,
+)
 from .reiri_client import ReiriClient
-from .coordinator import ReiriDataUpdateCoordinator
+from .coordinator import ReiriDataUpdateCoordinator, async_remove_storage
+from .services import async_setup_services
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -17,6 +26,7 @@ PLATFORMS = ["climate", "sensor", "binary_sensor"]
 
 async def async_setup(hass: HomeAssistant, config: dict):
     """Set up the Reiri component."""
+    async_setup_services(hass)
     return True
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
@@ -27,22 +37,51 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
     username = entry.data[CONF_USERNAME]
     password = entry.data[CONF_PASSWORD]
 
-    client = ReiriClient(ip_address, username, password, DEFAULT_PORT)
-
-    try:
-        await client.connect()
-        if not await client.login():
-            _LOGGER.error("Failed to login to Reiri controller")
-            return False
-    except Exception as e:
-        _LOGGER.error(f"Error connecting to Reiri controller: {e}")
-        raise ConfigEntryNotReady from e
+    # Reuse the session the config flow just authenticated, if any
+    client = hass.data[DOMAIN].get(FLOW_CLIENTS, {}).pop((ip_address, username), None)
+    if client is None:
+        client = ReiriClient(
+            ip_address,
+            username,
+            password,
+            DEFAULT_PORT,
+            dual_channel=entry.data.get(CONF_DUAL_CHANNEL, False),
+        )
 
     # Create coordinator
-    coordinator = ReiriDataUpdateCoordinator(hass, client)
-    
-    # Fetch initial data
-    await coordinator.async_config_entry_first_refresh()
+    coordinator = ReiriDataUpdateCoordinator(hass, client, entry.entry_id)
+    await coordinator.async_load_runtime()
+
+    if await coordinator.async_load_snapshot():
+        # Create entities from the last known state straight away; they stay
+        # unavailable until the connection and first live refresh complete.
+        entry.async_create_background_task(
+            hass, coordinator.async_refresh(), f"{DOMAIN} first refresh"
+        )
+    else:
+        if not client.connected:
+            try:
+                await client.connect()
+                if not await client.login():
+                    _LOGGER.error("Failed to login to Reiri controller")
+                    await client.close()
+                    return False
+            except Exception as e:
+                _LOGGER.error(f"Error connecting to Reiri controller: {e}")
+                await client.close()
+                raise ConfigEntryNotReady from e
+
+        # Fetch initial data
+        try:
+            await coordinator.async_config_entry_first_refresh()
+        except ConfigEntryNotReady:
+            await client.close()
+            raise
+
+    # Apply state changes pushed by the controller between polls
+    entry.async_on_unload(client.add_push_listener(coordinator.async_handle_push))
+    # Catch up as soon as the controller is reachable again after an outage
+    entry.async_on_unload(client.add_reconnect_listener(coordinator.async_handle_reconnect))
 
     # Register the controller device
     device_registry = dr.async_get(hass)
@@ -77,5 +116,10 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry):
     if unload_ok:
         data = hass.data[DOMAIN].pop(entry.entry_id)
         await data["client"].close()
+        await data["coordinator"].async_shutdown()
 
     return unload_ok
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry):
+    """Remove persisted data when the entry is deleted."""
+    await async_remove_storage(hass, entry.entry_id)
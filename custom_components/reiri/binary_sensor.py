@@ -1,16 +1,68 @@
 """Binary sensor platform for Reiri."""
+from collections.abc import Callable
+from dataclasses import dataclass
 import logging
 
-from homeassistant.components.binary_sensor import BinarySensorEntity, BinarySensorDeviceClass
+from homeassistant.components.binary_sensor import (
+    BinarySensorDeviceClass,
+    BinarySensorEntity,
+    BinarySensorEntityDescription,
+)
+from homeassistant.components.climate.const import HVACMode
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
 from .const import DOMAIN
 from .entity import ReiriEntity
+from .models import ReiriPoint
 
 _LOGGER = logging.getLogger(__name__)
 
+
+@dataclass(frozen=True, kw_only=True)
+class ReiriBinarySensorDescription(BinarySensorEntityDescription):
+    """Describes a binary sensor derived from one field of a unit."""
+
+    # mplist key a unit must report for the sensor to be created
+    raw_key: str
+    is_on_fn: Callable[[ReiriPoint], bool]
+
+
+BINARY_SENSORS = (
+    ReiriBinarySensorDescription(
+        key="filter",
+        name="Filter",
+        raw_key="filter",
+        # "on" means filter needs cleaning (problem)
+        device_class=BinarySensorDeviceClass.PROBLEM,
+        is_on_fn=lambda point: point.filter_alert,
+    ),
+    ReiriBinarySensorDescription(
+        key="compressor",
+        name="Compressor",
+        raw_key="thermo",
+        device_class=BinarySensorDeviceClass.RUNNING,
+        is_on_fn=lambda point: point.compressor_running,
+    ),
+    ReiriBinarySensorDescription(
+        key="power",
+        name="Power",
+        raw_key="stat",
+        device_class=BinarySensorDeviceClass.POWER,
+        entity_registry_enabled_default=False,
+        is_on_fn=lambda point: point.hvac_mode != HVACMode.OFF,
+    ),
+    ReiriBinarySensorDescription(
+        key="alarm",
+        name="Alarm",
+        raw_key="err",
+        device_class=BinarySensorDeviceClass.PROBLEM,
+        is_on_fn=lambda point: point.error_code is not None,
+    ),
+)
+
+
 async def async_setup_entry(
     hass: HomeAssistant,
     entry: ConfigEntry,
@@ -24,51 +76,28 @@ async def async_setup_entry(
     if not coordinator.data:
         return
 
-    entities = []
-    for point_id, point_data in coordinator.data.items():
-        if "filter" in point_data:
-            entities.append(ReiriFilterBinarySensor(coordinator, client, point_id))
-        
-        if "thermo" in point_data:
-            entities.append(ReiriCompressorBinarySensor(coordinator, client, point_id))
+    async_add_entities(
+        ReiriBinarySensor(coordinator, client, point_id, description)
+        for point_id, point in coordinator.points.items()
+        for description in BINARY_SENSORS
+        if description.raw_key in point.raw
+    )
 
-    async_add_entities(entities)
-
-
-class ReiriFilterBinarySensor(ReiriEntity, BinarySensorEntity):
-    """Filter Status Binary Sensor."""
-
-    _attr_device_class = BinarySensorDeviceClass.PROBLEM
-
-    def __init__(self, coordinator, client, point_id):
-        """Initialize."""
-        super().__init__(coordinator, client, point_id)
-        self._attr_unique_id = f"{point_id}_filter"
-        self._attr_name = f"{coordinator.data[point_id].get('name', point_id)} Filter"
-
-    @property
-    def is_on(self):
-        """Return true if the binary sensor is on."""
-        point_data = self.coordinator.data.get(self._point_id, {})
-        val = point_data.get("filter")
-        # "on" means filter needs cleaning (problem)
-        return val == "on"
 
-class ReiriCompressorBinarySensor(ReiriEntity, BinarySensorEntity):
-    """Compressor/Thermostat Status Binary Sensor."""
+class ReiriBinarySensor(ReiriEntity, BinarySensorEntity):
+    """Binary sensor for one field of a unit, described by its entity description."""
 
-    _attr_device_class = BinarySensorDeviceClass.RUNNING
+    entity_description: ReiriBinarySensorDescription
 
-    def __init__(self, coordinator, client, point_id):
+    def __init__(self, coordinator, client, point_id, description):
         """Initialize."""
         super().__init__(coordinator, client, point_id)
-        self._attr_unique_id = f"{point_id}_compressor"
-        self._attr_name = f"{coordinator.data[point_id].get('name', point_id)} Compressor"
-
-    @property
-    def is_on(self):
-        """Return true if the binary sensor is on."""
-        point_data = self.coordinator.data.get(self._point_id, {})
-        val = point_data.get("thermo")
-        # "on" means compressor is running
-        return val == "on"
+        self.entity_description = description
+        self._attr_unique_id = f"{point_id}_{description.key}"
+        self._attr_name = f"{coordinator.data[point_id].get('name', point_id)} {description.name}"
+        self._update_attrs()
+
+    def _update_attrs(self):
+        """Read the state from the parsed point record."""
+        point = self.point
+        self._attr_is_on = self.entity_description.is_on_fn(point) if point else False
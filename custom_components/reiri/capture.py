@@ -0,0 +1,145 @@
+"""Opt-in recorder for the decrypted traffic of a Reiri session.
+
+A capture is a JSON lines file. The first line is a header
+``{"capture": 1, "started": <unix time>}``; every further line is one message
+``[t, direction, kind, cmd, payload]`` where ``t`` is seconds since the
+capture started, ``direction`` is ``"out"`` for requests, ``"in"`` for
+responses and ``"push"`` for unsolicited frames, and ``payload`` is the
+decrypted document. Messages of the control session in dual-channel mode
+carry a sixth element, ``"control"``.
+
+Login credentials and key material are replaced before anything is written.
+Lines are buffered and written by a single worker thread, so recording costs
+the event loop one serialisation per message.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import logging
+import time
+
+from .codec import dumps, loads
+
+_LOGGER = logging.getLogger(__name__)
+
+CAPTURE_VERSION = 1
+REDACTED = "**REDACTED**"
+
+# Buffered lines are written at least this often (seconds) ...
+FLUSH_INTERVAL = 1.0
+# ... or as soon as this many are waiting
+FLUSH_LINES = 256
+
+
+def redact(cmd, payload):
+    """Return ``payload`` with credentials and key material replaced."""
+    if cmd == "login" and isinstance(payload, dict):
+        return {
+            key: REDACTED if key in ("name", "passwd") else value
+            for key, value in payload.items()
+        }
+    if cmd == "sys_info":
+        if isinstance(payload, dict):
+            return {
+                key: REDACTED if key == "common_key" else value
+                for key, value in payload.items()
+            }
+        # The client's public key
+        return REDACTED
+    return payload
+
+
+class CaptureRecorder:
+    """Append redacted protocol messages to a capture file."""
+
+    def __init__(self, path):
+        """Initialize."""
+        self.path = path
+        self.events = 0
+        self._start = None
+        self._file = None
+        self._buffer = []
+        self._flush_handle = None
+        # One worker keeps the writes in order
+        self._executor = None
+
+    async def async_open(self):
+        """Create the file and write the header."""
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="reiri_capture")
+        loop = asyncio.get_running_loop()
+        self._file = await loop.run_in_executor(
+            self._executor, lambda: open(self.path, "w", encoding="utf-8")
+        )
+        self._start = time.monotonic()
+        self._buffer.append(dumps({"capture": CAPTURE_VERSION, "started": time.time()}))
+        self._flush()
+
+    @property
+    def active(self):
+        """Return True until the recorder is closed."""
+        return self._file is not None
+
+    def record(self, direction, kind, cmd, payload, channel=None):
+        """Queue one message for writing."""
+        if self._file is None:
+            return
+        event = [round(time.monotonic() - self._start, 4), direction, kind, cmd, redact(cmd, payload)]
+        if channel is not None:
+            event.append(channel)
+        try:
+            self._buffer.append(dumps(event))
+        except (TypeError, ValueError) as e:
+            _LOGGER.debug(f"Not capturing {cmd} message: {e}")
+            return
+        self.events += 1
+        if len(self._buffer) >= FLUSH_LINES:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(
+                FLUSH_INTERVAL, self._flush
+            )
+
+    def _flush(self):
+        """Hand the buffered lines to the writer thread."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._buffer:
+            return None
+        lines, self._buffer = self._buffer, []
+        return asyncio.get_running_loop().run_in_executor(
+            self._executor, self._write, self._file, lines
+        )
+
+    @staticmethod
+    def _write(file, lines):
+        try:
+            file.write("\n".join(lines) + "\n")
+            file.flush()
+        except (OSError, ValueError) as e:
+            _LOGGER.warning(f"Failed to write protocol capture: {e}")
+
+    async def async_close(self):
+        """Write what is left and close the file."""
+        if self._file is None:
+            return
+        pending = self._flush()
+        if pending is not None:
+            await pending
+        file, self._file = self._file, None
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, file.close)
+        self._executor.shutdown(wait=False)
+        self._executor = None
+        _LOGGER.info(f"Protocol capture of {self.events} messages written to {self.path}")
+
+
+def load_capture(path):
+    """Read a capture file; returns (header, events)."""
+    with open(path, encoding="utf-8") as f:
+        lines = [line for line in f if line.strip()]
+    if not lines:
+        raise ValueError(f"{path} is empty")
+    header = loads(lines[0])
+    if not isinstance(header, dict) or header.get("capture") != CAPTURE_VERSION:
+        raise ValueError(f"{path} is not a version {CAPTURE_VERSION} Reiri capture")
+    return header, [loads(line) for line in lines[1:]]
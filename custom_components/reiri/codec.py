@@ -0,0 +1,57 @@
+"""Frame codec for the Reiri websocket protocol.
+
+Every frame is a JSON array ``[kind, seq, [cmd, payload]]`` where ``kind`` is
+``None`` for the plain handshake and ``"enc"`` once the payload is an AES
+encrypted, hex encoded JSON document. ``seq`` is always ``None`` on this
+controller.
+"""
+import json
+from typing import Any, NamedTuple
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson ships with Home Assistant
+    orjson = None
+
+if orjson is not None:
+    def dumps(obj):
+        """Serialize to compact JSON text."""
+        return orjson.dumps(obj).decode("utf-8")
+
+    loads = orjson.loads
+else:
+    def dumps(obj):
+        """Serialize to compact JSON text."""
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+
+    loads = json.loads
+
+
+class Frame(NamedTuple):
+    """A decoded protocol frame."""
+
+    kind: Any
+    seq: Any
+    cmd: str
+    payload: Any
+
+
+def decode_frame(raw):
+    """Parse a frame envelope once; returns None if it is not a command frame.
+
+    Encrypted payloads are returned as the hex string; decrypting them is left
+    to the session cipher.
+    """
+    data = loads(raw)
+    if not isinstance(data, list) or len(data) < 3:
+        return None
+    body = data[2]
+    if not isinstance(body, list) or not body or not isinstance(body[0], str):
+        return None
+    return Frame(data[0], data[1], body[0], body[1] if len(body) > 1 else None)
+
+
+def encode_frame(kind, cmd, payload=None, seq=None):
+    """Serialize a frame envelope."""
+    body = [cmd] if payload is None else [cmd, payload]
+    return dumps([kind, seq, body])
@@ -3,17 +3,27 @@ import logging
 import voluptuous as vol
 
 from homeassistant import config_entries
-from homeassistant.const import CONF_IP_ADDRESS, CONF_USERNAME, CONF_PASSWORD
-from .const import DOMAIN, DEFAULT_PORT
+from homeassistant.const import CONF_HOST, CONF_IP_ADDRESS, CONF_USERNAME, CONF_PASSWORD
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.event import async_call_later
+from .const import CONF_DUAL_CHANNEL, DOMAIN, DEFAULT_PORT, FLOW_CLIENTS
+from .discovery import async_discover_hubs, async_get_networks
 from .reiri_client import ReiriClient
 
 _LOGGER = logging.getLogger(__name__)
 
+# Close a handed-off session if no entry setup claims it within this time
+FLOW_CLIENT_TIMEOUT = 60
+
+# Choice in the discovery step for typing the address instead
+MANUAL_ENTRY = "manual"
+
 DATA_SCHEMA = vol.Schema(
     {
         vol.Required(CONF_IP_ADDRESS): str,
         vol.Required(CONF_USERNAME): str,
         vol.Required(CONF_PASSWORD): str,
+        vol.Optional(CONF_DUAL_CHANNEL, default=False): bool,
     }
 )
 
@@ -23,13 +33,60 @@ class ReiriConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     VERSION = 1
     CONNECTION_CLASS = config_entries.CONN_CLASS_LOCAL_POLL
 
+    def __init__(self):
+        """Initialize."""
+        # Controllers found on the network, by address; None until scanned
+        self._discovered = None
+
     async def async_step_user(self, user_input=None):
         """Handle the initial step."""
+        if user_input is None and self._discovered is None:
+            self._discovered = await self._async_discover()
+            if self._discovered:
+                return await self.async_step_pick()
+        return await self._async_step_credentials(user_input)
+
+    async def async_step_pick(self, user_input=None):
+        """Let the user choose one of the discovered controllers."""
+        if user_input is not None:
+            host = user_input[CONF_HOST]
+            suggested = {} if host == MANUAL_ENTRY else {CONF_IP_ADDRESS: host}
+            return self.async_show_form(
+                step_id="user",
+                data_schema=self.add_suggested_values_to_schema(DATA_SCHEMA, suggested),
+            )
+
+        choices = {
+            host: f"{host} ({hub.model})" if hub.model else host
+            for host, hub in sorted(self._discovered.items())
+        }
+        choices[MANUAL_ENTRY] = "Enter the address manually"
+        return self.async_show_form(
+            step_id="pick",
+            data_schema=vol.Schema({vol.Required(CONF_HOST): vol.In(choices)}),
+        )
+
+    async def _async_discover(self):
+        """Scan the local networks for controllers not configured yet."""
+        configured = {
+            entry.data.get(CONF_IP_ADDRESS) for entry in self._async_current_entries()
+        }
+        try:
+            networks = await async_get_networks(self.hass)
+            hubs = await async_discover_hubs(networks, DEFAULT_PORT)
+        except Exception:
+            _LOGGER.exception("Controller discovery failed")
+            return {}
+        return {hub.host: hub for hub in hubs if hub.host not in configured}
+
+    async def _async_step_credentials(self, user_input):
+        """Ask for the address and login details and validate them."""
         errors = {}
 
         if user_input is not None:
             try:
                 info = await self._validate_input(user_input)
+                _async_hand_off_client(self.hass, user_input, info["client"])
                 return self.async_create_entry(title=info["title"], data=user_input)
             except ConnectionError:
                 errors["base"] = "cannot_connect"
@@ -45,23 +102,47 @@ class ReiriConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
     async def _validate_input(self, data):
         """Validate the user input allows us to connect."""
-        client = ReiriClient(data[CONF_IP_ADDRESS], data[CONF_USERNAME], data[CONF_PASSWORD], DEFAULT_PORT)
+        client = ReiriClient(
+            data[CONF_IP_ADDRESS],
+            data[CONF_USERNAME],
+            data[CONF_PASSWORD],
+            DEFAULT_PORT,
+            dual_channel=data.get(CONF_DUAL_CHANNEL, False),
+        )
         
         try:
             await client.connect()
         except Exception as e:
             _LOGGER.error(f"Connection failed: {e}")
+            await client.close()
             raise ConnectionError from e
         
         try:
             if not await client.login():
                 raise PermissionError("Login failed")
         except PermissionError:
+            await client.close()
             raise
         except Exception as e:
             _LOGGER.error(f"Login error: {e}")
+            await client.close()
             raise PermissionError from e
-        finally:
+
+        return {"title": f"Reiri ({data[CONF_IP_ADDRESS]})", "client": client}
+
+
+def _async_hand_off_client(hass: HomeAssistant, data, client):
+    """Keep the authenticated session for the entry setup that follows."""
+    clients = hass.data.setdefault(DOMAIN, {}).setdefault(FLOW_CLIENTS, {})
+    key = (data[CONF_IP_ADDRESS], data[CONF_USERNAME])
+    previous = clients.get(key)
+    if previous is not None and previous is not client:
+        hass.async_create_task(previous.close())
+    clients[key] = client
+
+    async def _async_close_unclaimed(_now):
+        if clients.get(key) is client:
+            del clients[key]
             await client.close()
 
-        return {"title": f"Reiri ({data[CONF_IP_ADDRESS]})"}
+    async_call_later(hass, FLOW_CLIENT_TIMEOUT, _async_close_unclaimed)
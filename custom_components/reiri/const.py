@@ -4,4 +4,46 @@ DOMAIN = "reiri"
 CONF_IP_ADDRESS = "ip_address"
 CONF_USERNAME = "username"
 CONF_PASSWORD = "password"
+CONF_DUAL_CHANNEL = "dual_channel"
 DEFAULT_PORT = 52001
+
+# LAN discovery: hosts probed at once, and the per-host timeout (seconds)
+DISCOVERY_CONCURRENCY = 64
+DISCOVERY_TIMEOUT = 1.0
+
+# Polling intervals (seconds)
+DEFAULT_SCAN_INTERVAL = 30
+# Safety-net poll used while the controller is pushing state changes
+PUSH_SCAN_INTERVAL = 300
+# Fall back to normal polling if no push traffic is seen for this long
+PUSH_STALE_TIMEOUT = 600
+
+# Adaptive polling (seconds)
+FAST_SCAN_INTERVAL = 5
+# How long to poll quickly after a command is sent
+FAST_SCAN_WINDOW = 60
+# Interval used once nothing has changed for a while
+IDLE_SCAN_INTERVAL = 120
+# Upper bound for failure backoff
+MAX_SCAN_INTERVAL = 300
+# Never poll more often than this multiple of the measured round trip
+LATENCY_SCAN_FACTOR = 5
+
+# Give up waiting for the controller to confirm a command after this long (seconds)
+COMMAND_CONFIRM_TIMEOUT = 90
+
+# Persisted point snapshot used to create entities before the controller answers
+SNAPSHOT_STORAGE_VERSION = 1
+SNAPSHOT_SAVE_DELAY = 60
+# Persisted run time totals; written at most this often (seconds)
+RUNTIME_STORAGE_VERSION = 1
+RUNTIME_SAVE_DELAY = 300
+# Run time sensors of a unit whose data did not change are rewritten this often (seconds)
+RUNTIME_REFRESH_INTERVAL = 300
+# hass.data[DOMAIN] key for sessions authenticated by the config flow
+FLOW_CLIENTS = "flow_clients"
+# hass.data[DOMAIN] key for the snapshot and run time stores of each entry
+ENTRY_STORES = "stores"
+
+# Largest number of points sent in one op message by the bulk_operate service
+BULK_OPERATE_CHUNK_SIZE = 50
@@ -1,30 +1,269 @@
 """DataUpdateCoordinator for Reiri integration."""
 import logging
+import time
 from datetime import timedelta
 
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 
+from .const import (
+    DEFAULT_SCAN_INTERVAL,
+    DOMAIN,
+    ENTRY_STORES,
+    PUSH_STALE_TIMEOUT,
+    RUNTIME_SAVE_DELAY,
+    RUNTIME_STORAGE_VERSION,
+    SNAPSHOT_SAVE_DELAY,
+    SNAPSHOT_STORAGE_VERSION,
+)
+from .models import parse_points
+from .pending import PendingCommandTracker
+from .polling import AdaptivePollPolicy
 from .reiri_client import ReiriClient
+from .runtime import RuntimeTracker
 
 _LOGGER = logging.getLogger(__name__)
 
+
+def _entry_stores(hass: HomeAssistant, entry_id: str) -> tuple[Store, Store]:
+    """Return the stores holding an entry's last good mplist and run time totals.
+
+    The same Store objects are handed to every coordinator of the entry, so
+    a delayed save still pending from an earlier one is replaced or removed
+    rather than racing with it.
+    """
+    stores = hass.data.setdefault(DOMAIN, {}).setdefault(ENTRY_STORES, {})
+    if entry_id not in stores:
+        stores[entry_id] = (
+            Store(hass, SNAPSHOT_STORAGE_VERSION, f"{DOMAIN}.{entry_id}.snapshot"),
+            Store(hass, RUNTIME_STORAGE_VERSION, f"{DOMAIN}.{entry_id}.runtime"),
+        )
+    return stores[entry_id]
+
+
+async def async_remove_storage(hass: HomeAssistant, entry_id: str):
+    """Delete an entry's persisted snapshot and run time totals."""
+    for store in _entry_stores(hass, entry_id):
+        # Also cancels any save still waiting to be written
+        await store.async_remove()
+    hass.data[DOMAIN][ENTRY_STORES].pop(entry_id, None)
+
+
 class ReiriDataUpdateCoordinator(DataUpdateCoordinator):
     """Class to manage fetching Reiri data."""
 
-    def __init__(self, hass: HomeAssistant, client: ReiriClient):
+    def __init__(self, hass: HomeAssistant, client: ReiriClient, entry_id: str):
         """Initialize coordinator."""
         super().__init__(
             hass,
             _LOGGER,
             name="Reiri",
-            update_interval=timedelta(seconds=30),
+            update_interval=timedelta(seconds=DEFAULT_SCAN_INTERVAL),
         )
         self.client = client
+        # Point ids whose data changed in the most recent update
+        self.changed_points = set()
+        # Parsed ReiriPoint records, keyed by point id
+        self.points = {}
+        # Optimistic values awaiting confirmation from the controller
+        self.pending = PendingCommandTracker()
+        self.poll_policy = AdaptivePollPolicy()
+        # Last good mplist, used to create entities at startup, and run time
+        # totals per point, updated from the same data
+        self._snapshot_store, self._runtime_store = _entry_stores(hass, entry_id)
+        self._snapshot_save_pending = False
+        self.runtime = RuntimeTracker()
+        self._runtime_save_pending = False
+        # Set once async_shutdown has written the stores for the last time
+        self._stopped = False
+
+    async def async_load_snapshot(self):
+        """Seed the coordinator with the last saved mplist.
+
+        Entities created from the snapshot stay unavailable until the first
+        live refresh succeeds. Returns True if a snapshot was loaded.
+        """
+        snapshot = await self._snapshot_store.async_load()
+        if not snapshot:
+            return False
+        self.data = snapshot
+        self.points = parse_points(snapshot)
+        self.changed_points = set(self.points)
+        self.last_update_success = False
+        return True
+
+    @callback
+    def _async_save_snapshot(self):
+        """Persist the current data once things settle down."""
+        if self._stopped:
+            return
+        self._snapshot_save_pending = True
+        self._snapshot_store.async_delay_save(self._snapshot_data, SNAPSHOT_SAVE_DELAY)
+
+    @callback
+    def _snapshot_data(self):
+        """Return the point list to write."""
+        self._snapshot_save_pending = False
+        return self.data
+
+    async def async_load_runtime(self):
+        """Restore run time totals saved before the last restart."""
+        self.runtime.load(await self._runtime_store.async_load())
+
+    @callback
+    def _async_update_runtime(self):
+        """Account run time for the points changed by this update."""
+        self.runtime.update(self.points, self.changed_points)
+        # Totals grow all the time, so save on a fixed schedule rather than
+        # pushing the delayed write back on every update.
+        if not self._runtime_save_pending and not self._stopped:
+            self._runtime_save_pending = True
+            self._runtime_store.async_delay_save(self._runtime_data, RUNTIME_SAVE_DELAY)
+
+    @callback
+    def _runtime_data(self):
+        """Return the run time totals to write."""
+        self._runtime_save_pending = False
+        return self.runtime.as_dict()
+
+    async def async_shutdown(self):
+        """Stop refreshing and write pending saves straight away.
+
+        A delayed save left behind would later overwrite what the next
+        coordinator for this entry has written, with run time totals that
+        also count the time after the unload, or recreate the files of an
+        entry that has been deleted.
+        """
+        await super().async_shutdown()
+        if self._stopped:
+            return
+        self._stopped = True
+        if self._snapshot_save_pending:
+            self._snapshot_save_pending = False
+            await self._snapshot_store.async_save(self.data)
+        self.runtime.pause()
+        self._runtime_save_pending = False
+        await self._runtime_store.async_save(self.runtime.as_dict())
+
+    @property
+    def push_active(self):
+        """Return True if the controller has pushed state recently."""
+        last_push = self.client.last_push
+        return last_push is not None and time.monotonic() - last_push < PUSH_STALE_TIMEOUT
 
     async def _async_update_data(self):
         """Fetch data from Reiri controller."""
+        with self.client.metrics.time("refresh"):
+            return await self._async_fetch_points()
+
+    async def _async_fetch_points(self):
+        """Poll mplist and update change tracking and the poll policy."""
+        start = time.monotonic()
         try:
-            return await self.client.get_point_list()
+            data = await self.client.get_point_list()
         except Exception as err:
+            self.changed_points = set()
+            self.runtime.pause()
+            self.poll_policy.record_failure(time.monotonic() - start)
+            self._update_poll_interval()
             raise UpdateFailed(f"Error communicating with controller: {err}") from err
+
+        self.changed_points = self._diff_points(data)
+        self.points = parse_points(data, self.points, self.changed_points)
+        self.poll_policy.record_poll(time.monotonic() - start, bool(self.changed_points))
+        # Entities whose optimistic values were confirmed or expired must
+        # refresh even if their point data did not change this time.
+        self.changed_points |= self.pending.reconcile(self.points)
+        self._async_update_runtime()
+        self._update_poll_interval()
+        if self.changed_points:
+            self._async_save_snapshot()
+        return data
+
+    def _diff_points(self, new_data):
+        """Return the ids of points whose data differs from the current snapshot."""
+        old_data = self.data or {}
+        new_data = new_data or {}
+        changed = {
+            point_id
+            for point_id, values in new_data.items()
+            if old_data.get(point_id) != values
+        }
+        # Points that disappeared from the controller also need refreshing
+        changed.update(point_id for point_id in old_data if point_id not in new_data)
+        return changed
+
+    @property
+    def poll_latency(self):
+        """Return the smoothed mplist round trip in seconds."""
+        return self.poll_policy.latency
+
+    @property
+    def change_rate(self):
+        """Return the smoothed fraction of polls that saw a change."""
+        return self.poll_policy.change_rate
+
+    @callback
+    def _update_poll_interval(self):
+        """Apply the interval chosen by the adaptive poll policy."""
+        seconds = round(self.poll_policy.next_interval(self.push_active), 1)
+        interval = timedelta(seconds=seconds)
+        if interval != self.update_interval:
+            _LOGGER.debug(f"Switching poll interval to {seconds}s")
+            self.update_interval = interval
+
+    @callback
+    def async_note_command(self):
+        """Poll quickly for a while so a command's effect is confirmed soon."""
+        self.poll_policy.note_command()
+        self._update_poll_interval()
+        # Pull the next poll forward if one was scheduled further out
+        if self._listeners:
+            self._schedule_refresh()
+
+    @callback
+    def async_update_points(self, point_ids):
+        """Rewrite entity state for ``point_ids`` without new controller data.
+
+        Used after optimistic values for several points were changed at once.
+        """
+        self.changed_points = set(point_ids)
+        self.async_update_listeners()
+
+    @callback
+    def async_handle_reconnect(self):
+        """Refresh soon after the client re-establishes a lost session."""
+        self.hass.async_create_task(self.async_request_refresh())
+
+    @callback
+    def async_handle_push(self, cmd, payload):
+        """Apply an unsolicited status frame from the controller."""
+        if not isinstance(payload, dict) or self.data is None:
+            return
+
+        if cmd == "mplist":
+            # Full snapshot pushed by the controller
+            new_data = payload
+        else:
+            # Partial update keyed by point id, same shape as mplist entries
+            updates = {
+                point_id: values
+                for point_id, values in payload.items()
+                if point_id in self.data and isinstance(values, dict)
+            }
+            if not updates:
+                return
+            new_data = dict(self.data)
+            for point_id, values in updates.items():
+                new_data[point_id] = {**new_data[point_id], **values}
+
+        changed = self._diff_points(new_data)
+        self._update_poll_interval()
+        if not changed:
+            return
+        self.points = parse_points(new_data, self.points, changed)
+        self.changed_points = changed | self.pending.reconcile(self.points)
+        self._async_update_runtime()
+        self.async_set_updated_data(new_data)
+        self._async_save_snapshot()
@@ -0,0 +1,112 @@
+"""Key management and ciphers for the Reiri protocol."""
+import asyncio
+import base64
+import logging
+
+from cryptography.hazmat.backends import default_backend
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import padding as asym_padding
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+
+from .codec import loads
+
+_LOGGER = logging.getLogger(__name__)
+
+_OAEP_SHA1 = asym_padding.OAEP(
+    mgf=asym_padding.MGF1(algorithm=hashes.SHA1()),
+    algorithm=hashes.SHA1(),
+    label=None,
+)
+
+# The controller only uses the RSA key to wrap the per-session AES key, so a
+# single process-wide keypair is generated once and reused for every connect.
+_keypair = None
+_keypair_lock = asyncio.Lock()
+
+
+class RsaKeypair:
+    """An RSA private key together with its PKCS#1 PEM public key."""
+
+    __slots__ = ("private_key", "public_pem")
+
+    def __init__(self, private_key):
+        """Initialize."""
+        self.private_key = private_key
+        self.public_pem = private_key.public_key().public_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PublicFormat.PKCS1,
+        ).decode("utf-8")
+
+    @classmethod
+    def generate(cls):
+        """Generate a new 2048-bit keypair. Blocking; run in an executor."""
+        return cls(
+            rsa.generate_private_key(
+                public_exponent=65537,
+                key_size=2048,
+                backend=default_backend(),
+            )
+        )
+
+    def decrypt_common_key(self, encoded):
+        """Unwrap the base64 RSA-OAEP encrypted common key. Blocking."""
+        return self.private_key.decrypt(base64.b64decode(encoded), _OAEP_SHA1)
+
+
+async def async_get_keypair():
+    """Return the shared keypair, generating it in an executor on first use."""
+    global _keypair
+    if _keypair is not None:
+        return _keypair
+
+    async with _keypair_lock:
+        if _keypair is None:
+            _LOGGER.debug("Generating RSA keypair")
+            loop = asyncio.get_running_loop()
+            _keypair = await loop.run_in_executor(None, RsaKeypair.generate)
+    return _keypair
+
+
+class SessionCipher:
+    """AES-128-CBC cipher for one session's common key.
+
+    The controller uses the common key as both key and IV for every message,
+    so the ``Cipher`` is built once per session and only the cheap
+    encryptor/decryptor contexts are created per message. PKCS#7 padding is
+    applied and stripped in place rather than through padder objects.
+    """
+
+    __slots__ = ("_cipher",)
+
+    def __init__(self, common_key):
+        """Initialize."""
+        self._cipher = Cipher(
+            algorithms.AES(common_key), modes.CBC(common_key), backend=default_backend()
+        )
+
+    def encrypt(self, plaintext):
+        """Encrypt a string and return the ciphertext as hex."""
+        data = plaintext.encode("utf-8")
+        pad = 16 - len(data) % 16
+        encryptor = self._cipher.encryptor()
+        ciphertext = encryptor.update(data + bytes((pad,)) * pad)
+        ciphertext += encryptor.finalize()
+        return ciphertext.hex()
+
+    def decrypt(self, hex_ciphertext):
+        """Decrypt hex ciphertext and return the unpadded plaintext bytes."""
+        decryptor = self._cipher.decryptor()
+        padded = decryptor.update(bytes.fromhex(hex_ciphertext))
+        tail = decryptor.finalize()
+        if tail:
+            padded += tail
+
+        pad = padded[-1] if padded else 0
+        if not 1 <= pad <= 16 or padded.count(pad, len(padded) - pad) != pad:
+            raise ValueError("Invalid padding")
+        return padded[:-pad]
+
+    def decrypt_json(self, hex_ciphertext):
+        """Decrypt hex ciphertext and parse the JSON plaintext."""
+        return loads(self.decrypt(hex_ciphertext))
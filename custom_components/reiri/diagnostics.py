@@ -0,0 +1,55 @@
+"""Diagnostics support for Reiri."""
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import CONF_PASSWORD, CONF_USERNAME, DOMAIN
+
+TO_REDACT = {CONF_PASSWORD, CONF_USERNAME}
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry):
+    """Return diagnostics for a config entry."""
+    data = hass.data[DOMAIN][entry.entry_id]
+    client = data["client"]
+    coordinator = data["coordinator"]
+    policy = coordinator.poll_policy
+    control = client.control_channel
+    pending = coordinator.pending
+
+    return {
+        "entry": async_redact_data(dict(entry.data), TO_REDACT),
+        "connection": {
+            "connected": client.connected,
+            "push_active": coordinator.push_active,
+            "circuit_open": client.circuit_open,
+            "consecutive_failures": client.consecutive_failures,
+            "retry_in_s": client.retry_in,
+        },
+        "polling": {
+            "update_interval_s": coordinator.update_interval.total_seconds(),
+            "latency_s": policy.latency,
+            "change_rate": policy.change_rate,
+            "consecutive_failures": policy.consecutive_failures,
+            "in_fast_window": policy.in_fast_window,
+        },
+        "commands": {
+            "confirmed": pending.confirmed,
+            "failed": pending.failed,
+            "timed_out": pending.timed_out,
+            "confirmation_latency_s": pending.latency_stats(),
+            "confirmation_latency_by_point_s": {
+                point_id: pending.latency_stats(point_id) for point_id in coordinator.points
+            },
+        },
+        "scheduler": client.scheduler.as_dict(),
+        "throttle": client.throttle.as_dict(),
+        "metrics": client.metrics.as_dict(),
+        "control_channel": None if control is None else {
+            "connected": control.connected,
+            "scheduler": control.scheduler.as_dict(),
+            "throttle": control.throttle.as_dict(),
+            "metrics": control.metrics.as_dict(),
+        },
+        "point_count": len(coordinator.points),
+    }
@@ -0,0 +1,107 @@
+"""Discovery of Reiri controllers on the local network.
+
+Every address of the given networks is probed on the controller port with
+bounded concurrency and a short timeout per host. A host only counts as a
+controller if it answers the plain ``sys_info`` handshake frame with a
+wrapped session key; the key itself is never unwrapped.
+"""
+import asyncio
+from dataclasses import dataclass
+import ipaddress
+import logging
+
+import websockets
+
+from homeassistant.components import network
+from homeassistant.core import HomeAssistant
+
+from .codec import decode_frame, encode_frame
+from .const import DEFAULT_PORT, DISCOVERY_CONCURRENCY, DISCOVERY_TIMEOUT
+from .crypto import async_get_keypair
+
+_LOGGER = logging.getLogger(__name__)
+
+# Networks larger than this are narrowed to the /24 around our own address
+MAX_PREFIX = 24
+
+
+@dataclass(frozen=True)
+class DiscoveredHub:
+    """A controller that answered the handshake."""
+
+    host: str
+    port: int
+    model: str | None = None
+
+
+async def async_get_networks(hass: HomeAssistant):
+    """Return the IPv4 networks of the adapters Home Assistant uses."""
+    networks = []
+    for adapter in await network.async_get_adapters(hass):
+        if not adapter["enabled"]:
+            continue
+        for ipv4 in adapter["ipv4"]:
+            address = ipaddress.ip_address(ipv4["address"])
+            if address.is_loopback or address.is_link_local:
+                continue
+            prefix = max(ipv4["network_prefix"], MAX_PREFIX)
+            net = ipaddress.ip_network(f"{address}/{prefix}", strict=False)
+            if net not in networks:
+                networks.append(net)
+    return networks
+
+
+async def async_discover_hubs(
+    networks,
+    port=DEFAULT_PORT,
+    timeout=DISCOVERY_TIMEOUT,
+    concurrency=DISCOVERY_CONCURRENCY,
+):
+    """Probe every host of ``networks`` and return the controllers found.
+
+    ``networks`` holds ``ipaddress`` networks or strings such as
+    ``"192.168.1.0/24"``; a single address is probed on its own.
+    """
+    hosts = []
+    for net in networks:
+        net = ipaddress.ip_network(net, strict=False)
+        hosts.extend(str(host) for host in (net.hosts() if net.num_addresses > 1 else [net.network_address]))
+    hosts = list(dict.fromkeys(hosts))
+
+    # The handshake frame is the same for every host
+    keypair = await async_get_keypair()
+    hello = encode_frame(None, "sys_info", keypair.public_pem)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def probe(host):
+        async with semaphore:
+            try:
+                return await asyncio.wait_for(_async_probe(host, port, hello), timeout)
+            except (asyncio.TimeoutError, OSError, websockets.exceptions.WebSocketException):
+                return None
+            except Exception as e:
+                _LOGGER.debug(f"Probe of {host}:{port} failed: {e}")
+                return None
+
+    results = await asyncio.gather(*(probe(host) for host in hosts))
+    hubs = [hub for hub in results if hub is not None]
+    _LOGGER.debug(f"Probed {len(hosts)} hosts on port {port}, found {len(hubs)} controller(s)")
+    return hubs
+
+
+async def _async_probe(host, port, hello):
+    """Return a DiscoveredHub if ``host`` answers the sys_info handshake."""
+    async with websockets.connect(
+        f"ws://{host}:{port}/", ping_interval=None, open_timeout=None
+    ) as websocket:
+        await websocket.send(hello)
+        async for raw in websocket:
+            frame = decode_frame(raw)
+            if frame is None or frame.cmd != "sys_info":
+                continue
+            payload = frame.payload
+            if isinstance(payload, dict) and "common_key" in payload:
+                model = payload.get("model")
+                return DiscoveredHub(host, port, str(model) if model is not None else None)
+            return None
+    return None
@@ -1,4 +1,5 @@
 """Reiri base entity."""
+from homeassistant.core import callback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from .const import DOMAIN
 
@@ -11,14 +12,37 @@ class ReiriEntity(CoordinatorEntity):
         self._client = client
         self._point_id = point_id
         self._attr_unique_id = point_id
+        self._last_available = None
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write state only when this point's data or availability changed."""
+        available = self.available
+        if available == self._last_available and not self._should_update():
+            return
+        self._last_available = available
+        self._update_attrs()
+        self.async_write_ha_state()
+
+    @property
+    def point(self):
+        """Return the parsed record for this point, if the controller reported it."""
+        return self.coordinator.points.get(self._point_id)
+
+    def _should_update(self):
+        """Return True if the last coordinator update touched this point."""
+        return self._point_id in self.coordinator.changed_points
+
+    def _update_attrs(self):
+        """Refresh cached attributes from coordinator data."""
 
     @property
     def device_info(self):
         """Return information to link this entity with the correct device."""
-        point_data = self.coordinator.data.get(self._point_id, {})
+        point = self.point
         return {
             "identifiers": {(DOMAIN, self._point_id)},
-            "name": point_data.get("name", self._point_id),
+            "name": point.name if point else self._point_id,
             "manufacturer": "Reiri",
             "model": "Air Conditioner",
             "via_device": (DOMAIN, "controller"),
@@ -0,0 +1,105 @@
+"""Lightweight performance counters for the Reiri client."""
+import bisect
+import time
+from contextlib import contextmanager
+
+# Histogram bucket upper bounds in milliseconds
+BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram with running totals."""
+
+    __slots__ = ("count", "total", "last", "min", "max", "buckets")
+
+    def __init__(self):
+        """Initialize."""
+        self.count = 0
+        self.total = 0.0
+        self.last = None
+        self.min = None
+        self.max = None
+        # One extra bucket for values above the largest bound
+        self.buckets = [0] * (len(BUCKETS_MS) + 1)
+
+    def observe(self, seconds):
+        """Record a duration in seconds."""
+        ms = seconds * 1000
+        self.count += 1
+        self.total += ms
+        self.last = ms
+        self.min = ms if self.min is None else min(self.min, ms)
+        self.max = ms if self.max is None else max(self.max, ms)
+        self.buckets[bisect.bisect_left(BUCKETS_MS, ms)] += 1
+
+    @property
+    def mean(self):
+        """Return the mean in milliseconds."""
+        return self.total / self.count if self.count else None
+
+    def percentile(self, q):
+        """Return the bucket bound covering quantile ``q`` (0..1), in milliseconds."""
+        if not self.count:
+            return None
+        target = q * self.count
+        seen = 0
+        for bound, count in zip(BUCKETS_MS, self.buckets):
+            seen += count
+            if seen >= target:
+                return min(bound, self.max)
+        return self.max
+
+    def as_dict(self):
+        """Return a JSON-serialisable summary."""
+        return {
+            "count": self.count,
+            "last_ms": self.last,
+            "mean_ms": self.mean,
+            "min_ms": self.min,
+            "max_ms": self.max,
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "buckets": {
+                f"le_{bound}ms": count for bound, count in zip(BUCKETS_MS, self.buckets)
+            } | {"gt_max": self.buckets[-1]},
+        }
+
+
+class ReiriMetrics:
+    """Named timers and counters collected by the client and coordinator."""
+
+    def __init__(self):
+        """Initialize."""
+        self.timers = {}
+        self.counters = {}
+
+    def observe(self, name, seconds):
+        """Record a duration for ``name``."""
+        timer = self.timers.get(name)
+        if timer is None:
+            timer = self.timers[name] = Histogram()
+        timer.observe(seconds)
+
+    def increment(self, name, amount=1):
+        """Increase counter ``name``."""
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    @contextmanager
+    def time(self, name):
+        """Time the enclosed block, including when it raises."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def timer(self, name):
+        """Return the histogram for ``name``, if anything was recorded."""
+        return self.timers.get(name)
+
+    def as_dict(self):
+        """Return a JSON-serialisable snapshot of all metrics."""
+        return {
+            "timers": {name: timer.as_dict() for name, timer in sorted(self.timers.items())},
+            "counters": dict(sorted(self.counters.items())),
+        }
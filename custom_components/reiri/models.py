@@ -0,0 +1,253 @@
+"""Parsed point records for Reiri mplist data."""
+from functools import lru_cache
+
+from homeassistant.components.climate.const import HVACMode
+
+# Map Reiri modes to HA modes
+REIRI_TO_HA_MODE = {
+    "C": HVACMode.COOL,
+    "H": HVACMode.HEAT,
+    "F": HVACMode.FAN_ONLY,
+    "D": HVACMode.DRY,
+    "A": HVACMode.AUTO,
+}
+
+HA_TO_REIRI_MODE = {v: k for k, v in REIRI_TO_HA_MODE.items()}
+
+# Map Reiri fan steps to HA fan modes
+REIRI_TO_HA_FAN = {
+    "A": "auto",
+    "L": "low",
+    "LM": "medium-low",
+    "M": "medium",
+    "MH": "medium-high",
+    "H": "high",
+}
+
+HA_TO_REIRI_FAN = {v: k for k, v in REIRI_TO_HA_FAN.items()}
+
+SWING_MODES = ["swing"] + [str(i) for i in range(5)]
+
+
+def _as_float(val):
+    """Return val as a float, or 0.0 if it is not numeric."""
+    try:
+        return float(val)
+    except (ValueError, TypeError):
+        return 0.0
+
+
+def _as_float_or_none(val):
+    """Return val as a float, or None if it is missing or not numeric."""
+    try:
+        return float(val)
+    except (ValueError, TypeError):
+        return None
+
+
+def _error_code(val):
+    """Return an error code as text, or None if it reports no error."""
+    if val is None:
+        return None
+    code = str(val).strip()
+    return None if code in ("", "0", "00", "-") else code
+
+
+def _cap_signature(caps):
+    """Return a hashable signature for a capability dict."""
+    if not isinstance(caps, dict):
+        return ()
+    try:
+        return tuple(sorted(caps.items()))
+    except TypeError:
+        return tuple(sorted((k, repr(v)) for k, v in caps.items()))
+
+
+class PointCapabilities:
+    """Mode lists derived from a point's capability flags."""
+
+    __slots__ = ("hvac_modes", "fan_modes", "swing_modes")
+
+    def __init__(self, mode_cap, fanstep_cap, flap_cap):
+        """Initialize from capability signatures."""
+        mode_cap = dict(mode_cap)
+        fanstep_cap = dict(fanstep_cap)
+        flap_cap = dict(flap_cap)
+
+        # HVAC Modes List
+        modes = [HVACMode.OFF]
+        for reiri_mode, ha_mode in REIRI_TO_HA_MODE.items():
+            if mode_cap.get(reiri_mode):
+                modes.append(ha_mode)
+        self.hvac_modes = modes
+
+        # Fan Modes List
+        fan_modes = []
+        if fanstep_cap.get("A"):
+            fan_modes.append("auto")
+
+        steps = fanstep_cap.get("S", 0)
+        if steps == 2:
+            fan_modes.extend(["low", "high"])
+        elif steps == 3:
+            fan_modes.extend(["low", "medium", "high"])
+        elif steps == 5:
+            fan_modes.extend(["low", "medium-low", "medium", "medium-high", "high"])
+        else:
+            if steps >= 1: fan_modes.append("low")
+            if steps >= 2: fan_modes.append("high")
+            if steps >= 3: fan_modes.append("medium")
+        self.fan_modes = fan_modes
+
+        # Swing Modes List. The webapp treats a missing flap_cap.D as 3 steps;
+        # only an explicit 0 means the unit has no flap control. Positions 0-4
+        # are always exposed, matching the webapp's S -> 4 -> ... -> 0 cycle.
+        flap_steps = flap_cap.get("D", 3)
+        self.swing_modes = None if flap_steps == 0 else SWING_MODES
+
+
+@lru_cache(maxsize=64)
+def get_capabilities(mode_cap, fanstep_cap, flap_cap):
+    """Return shared capabilities for a capability signature."""
+    return PointCapabilities(mode_cap, fanstep_cap, flap_cap)
+
+
+class ReiriPoint:
+    """Typed view of one mplist entry, parsed once per refresh."""
+
+    __slots__ = (
+        "point_id",
+        "raw",
+        "name",
+        "current_temperature",
+        "room_temperature",
+        "hvac_mode",
+        "target_temperature",
+        "setpoint",
+        "cool_setpoint",
+        "heat_setpoint",
+        "fan_mode",
+        "swing_mode",
+        "outdoor_temperature",
+        "filter_alert",
+        "compressor_running",
+        "error_code",
+        "capabilities",
+    )
+
+    def __init__(self, point_id, raw):
+        """Parse a raw mplist entry."""
+        self.point_id = point_id
+        self.raw = raw
+        self.name = raw.get("name", point_id)
+
+        self.current_temperature = _as_float(raw.get("temp", 0))
+        # For the sensor, which must not record a missing reading as 0
+        self.room_temperature = _as_float_or_none(raw.get("temp"))
+
+        mode = raw.get("mode")
+        if raw.get("stat") == "off":
+            self.hvac_mode = HVACMode.OFF
+        else:
+            self.hvac_mode = REIRI_TO_HA_MODE.get(mode, HVACMode.AUTO)
+
+        if mode == "C":
+            self.target_temperature = _as_float(raw.get("csp", 0))
+        elif mode == "H":
+            self.target_temperature = _as_float(raw.get("hsp", 0))
+        else:
+            self.target_temperature = _as_float(raw.get("sp", 0))
+        # Raw setpoints for the sensors; None if the unit does not report them
+        self.setpoint = _as_float_or_none(raw.get("sp"))
+        self.cool_setpoint = _as_float_or_none(raw.get("csp"))
+        self.heat_setpoint = _as_float_or_none(raw.get("hsp"))
+
+        fanstep = raw.get("fanstep")
+        if fanstep:
+            self.fan_mode = REIRI_TO_HA_FAN.get(fanstep) or str(fanstep).lower()
+        else:
+            self.fan_mode = None
+
+        flap = raw.get("flap")
+        if flap == "S":
+            self.swing_mode = "swing"
+        elif flap is not None:
+            self.swing_mode = str(flap)
+        else:
+            self.swing_mode = None
+
+        # According to logs, otemp is an integer like 30 or 31
+        self.outdoor_temperature = raw.get("otemp")
+        # "on" means filter needs cleaning (problem)
+        self.filter_alert = raw.get("filter") == "on"
+        # "on" means compressor is running
+        self.compressor_running = raw.get("thermo") == "on"
+        # Malfunction code; None while the unit reports no error
+        self.error_code = _error_code(raw.get("err"))
+
+        self.capabilities = get_capabilities(
+            _cap_signature(raw.get("mode_cap", {})),
+            _cap_signature(raw.get("fanstep_cap", {})),
+            _cap_signature(raw.get("flap_cap", {})),
+        )
+
+    def __repr__(self):
+        """Return a debug representation."""
+        return f"<ReiriPoint {self.point_id} {self.name!r} {self.hvac_mode}>"
+
+
+def expected_point_values(point, attrs):
+    """Return the ``ReiriPoint`` fields an op command should produce.
+
+    ``attrs`` uses controller keys (``stat``, ``mode``, ``sp``, ``fanstep``,
+    ``flap``). The result is keyed by ``ReiriPoint`` attribute names so it can
+    be fed straight into the pending command tracker.
+    """
+    values = {}
+    stat = attrs.get("stat")
+    mode = attrs.get("mode")
+    if stat == "off":
+        values["hvac_mode"] = HVACMode.OFF
+    elif stat == "on" or (mode and point.hvac_mode != HVACMode.OFF):
+        # A mode change on a unit that is off does not switch it on
+        values["hvac_mode"] = REIRI_TO_HA_MODE.get(mode or point.raw.get("mode"), HVACMode.AUTO)
+
+    if "sp" in attrs:
+        values["target_temperature"] = _as_float(attrs["sp"])
+
+    fanstep = attrs.get("fanstep")
+    if fanstep:
+        values["fan_mode"] = REIRI_TO_HA_FAN.get(fanstep) or str(fanstep).lower()
+
+    flap = attrs.get("flap")
+    if flap == "S":
+        values["swing_mode"] = "swing"
+    elif flap is not None:
+        values["swing_mode"] = str(flap)
+    return values
+
+
+def point_result(response, point_id):
+    """Return the controller's verdict for one point of an op response."""
+    if not isinstance(response, dict):
+        return "OK" if response is not None else "NG"
+    return response.get(point_id, response.get("result", "OK"))
+
+
+def parse_points(data, previous=None, changed=None):
+    """Parse mplist data into ReiriPoint records.
+
+    When ``previous`` and ``changed`` are given, records for unchanged points
+    are carried over instead of being parsed again.
+    """
+    if not data:
+        return {}
+    points = {}
+    for point_id, raw in data.items():
+        if not isinstance(raw, dict):
+            continue
+        if changed is not None and point_id not in changed and previous and point_id in previous:
+            points[point_id] = previous[point_id]
+        else:
+            points[point_id] = ReiriPoint(point_id, raw)
+    return points
@@ -0,0 +1,110 @@
+"""Tracking of commands awaiting confirmation from the controller."""
+import collections
+import logging
+import statistics
+import time
+
+from .const import COMMAND_CONFIRM_TIMEOUT
+
+_LOGGER = logging.getLogger(__name__)
+
+# Confirmation latencies kept per point
+LATENCY_SAMPLES = 50
+
+
+class PendingCommand:
+    """An attribute value sent to the controller but not yet seen in mplist."""
+
+    __slots__ = ("point_id", "attr", "value", "sent")
+
+    def __init__(self, point_id, attr, value):
+        """Initialize."""
+        self.point_id = point_id
+        self.attr = attr
+        self.value = value
+        self.sent = time.monotonic()
+
+
+class PendingCommandTracker:
+    """Hold optimistic values per point and attribute until confirmed.
+
+    ``attr`` names match the derived fields on ``ReiriPoint`` (for example
+    ``target_temperature`` or ``hvac_mode``), so confirmation is a plain
+    comparison against the latest parsed record.
+    """
+
+    def __init__(self, timeout=COMMAND_CONFIRM_TIMEOUT):
+        """Initialize."""
+        self.timeout = timeout
+        self._pending = {}
+        self._latencies = collections.defaultdict(
+            lambda: collections.deque(maxlen=LATENCY_SAMPLES)
+        )
+        self.confirmed = 0
+        self.failed = 0
+        self.timed_out = 0
+
+    def add(self, point_id, attr, value):
+        """Record a command; it replaces any earlier one for the same attribute."""
+        pending = PendingCommand(point_id, attr, value)
+        self._pending[(point_id, attr)] = pending
+        return pending
+
+    def get(self, point_id, attr):
+        """Return the pending command for an attribute, if any."""
+        return self._pending.get((point_id, attr))
+
+    def fail(self, pending):
+        """Drop a command whose send failed, unless a newer one replaced it."""
+        key = (pending.point_id, pending.attr)
+        if self._pending.get(key) is pending:
+            del self._pending[key]
+            self.failed += 1
+
+    def reconcile(self, points):
+        """Release commands confirmed by ``points`` or past the timeout.
+
+        Returns the ids of points with at least one released command.
+        """
+        if not self._pending:
+            return set()
+
+        now = time.monotonic()
+        released = set()
+        for key, pending in list(self._pending.items()):
+            point = points.get(pending.point_id)
+            if point is not None and getattr(point, pending.attr, None) == pending.value:
+                latency = now - pending.sent
+                self._latencies[pending.point_id].append(latency)
+                self.confirmed += 1
+                _LOGGER.debug(
+                    f"{pending.point_id} confirmed {pending.attr}={pending.value} after {latency:.1f}s"
+                )
+            elif now - pending.sent > self.timeout:
+                self.timed_out += 1
+                _LOGGER.debug(
+                    f"{pending.point_id} never confirmed {pending.attr}={pending.value}; "
+                    f"reverting to controller state"
+                )
+            else:
+                continue
+            del self._pending[key]
+            released.add(pending.point_id)
+        return released
+
+    def latency_stats(self, point_id=None):
+        """Return command-to-confirmation latency statistics in seconds."""
+        if point_id is None:
+            samples = [s for deque in self._latencies.values() for s in deque]
+        else:
+            samples = list(self._latencies.get(point_id, ()))
+        if not samples:
+            return None
+        samples.sort()
+        return {
+            "count": len(samples),
+            "min": samples[0],
+            "median": statistics.median(samples),
+            "p95": samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+            "max": samples[-1],
+        }
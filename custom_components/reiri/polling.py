@@ -0,0 +1,100 @@
+"""Adaptive poll interval policy for the Reiri coordinator."""
+import time
+
+from .const import (
+    DEFAULT_SCAN_INTERVAL,
+    FAST_SCAN_INTERVAL,
+    FAST_SCAN_WINDOW,
+    IDLE_SCAN_INTERVAL,
+    LATENCY_SCAN_FACTOR,
+    MAX_SCAN_INTERVAL,
+    PUSH_SCAN_INTERVAL,
+)
+
+
+class AdaptivePollPolicy:
+    """Choose the next poll interval from recent activity and controller health.
+
+    - For ``fast_window`` seconds after a command, poll every ``fast_interval``
+      so the new state is confirmed quickly.
+    - Otherwise slide between ``base_interval`` and ``idle_interval`` according
+      to how often recent polls saw any change.
+    - Never poll faster than ``latency_factor`` times the measured round trip,
+      and back off exponentially while polls are failing.
+    """
+
+    def __init__(
+        self,
+        base_interval=DEFAULT_SCAN_INTERVAL,
+        fast_interval=FAST_SCAN_INTERVAL,
+        fast_window=FAST_SCAN_WINDOW,
+        idle_interval=IDLE_SCAN_INTERVAL,
+        push_interval=PUSH_SCAN_INTERVAL,
+        max_interval=MAX_SCAN_INTERVAL,
+        latency_factor=LATENCY_SCAN_FACTOR,
+        smoothing=0.2,
+    ):
+        """Initialize the policy."""
+        self.base_interval = base_interval
+        self.fast_interval = fast_interval
+        self.fast_window = fast_window
+        self.idle_interval = idle_interval
+        self.push_interval = push_interval
+        self.max_interval = max_interval
+        self.latency_factor = latency_factor
+        self.smoothing = smoothing
+
+        # Exponentially weighted poll round trip, in seconds
+        self.latency = None
+        # Exponentially weighted fraction of polls that saw a change (0..1)
+        self.change_rate = 1.0
+        self.consecutive_failures = 0
+        self._last_command = None
+
+    def note_command(self):
+        """Record that a command was just sent to the controller."""
+        self._last_command = time.monotonic()
+
+    def record_poll(self, latency, changed):
+        """Record a successful poll and whether it saw any change."""
+        self.consecutive_failures = 0
+        self.latency = self._smooth(self.latency, latency)
+        self.change_rate = self._smooth(self.change_rate, 1.0 if changed else 0.0)
+
+    def record_failure(self, latency=None):
+        """Record a failed or timed out poll."""
+        self.consecutive_failures += 1
+        if latency is not None:
+            self.latency = self._smooth(self.latency, latency)
+
+    def _smooth(self, current, sample):
+        if current is None:
+            return sample
+        return current + self.smoothing * (sample - current)
+
+    @property
+    def in_fast_window(self):
+        """Return True while a recent command is awaiting confirmation."""
+        return (
+            self._last_command is not None
+            and time.monotonic() - self._last_command < self.fast_window
+        )
+
+    def next_interval(self, push_active=False):
+        """Return the number of seconds until the next poll."""
+        if self.consecutive_failures:
+            backoff = self.base_interval * 2 ** (self.consecutive_failures - 1)
+            return min(self.max_interval, backoff)
+
+        if self.in_fast_window:
+            interval = self.fast_interval
+        elif push_active:
+            interval = self.push_interval
+        else:
+            span = self.idle_interval - self.base_interval
+            interval = self.base_interval + span * (1.0 - self.change_rate)
+
+        if self.latency is not None:
+            interval = max(interval, self.latency * self.latency_factor)
+
+        return min(self.max_interval, interval)
@@ -1,16 +1,29 @@
 import asyncio
-import json
+import collections
 import logging
+import random
+import time
 import websockets
-import base64
-from cryptography.hazmat.primitives.asymmetric import rsa, padding as asym_padding
-from cryptography.hazmat.primitives import serialization, hashes
-from cryptography.hazmat.backends import default_backend
-from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
-from cryptography.hazmat.primitives import padding as sym_padding
+
+from .capture import CaptureRecorder
+from .codec import decode_frame, dumps, encode_frame, loads
+from .crypto import SessionCipher, async_get_keypair
+from .metrics import ReiriMetrics
+from .scheduler import (
+    PRIORITY_AUTOMATION,
+    PRIORITY_INTERACTIVE,
+    PRIORITY_POLL,
+    RequestScheduler,
+)
+from .throttle import WriteThrottle
 
 _LOGGER = logging.getLogger(__name__)
 
+# Commands the client sends itself. A frame for one of these that no request
+# is waiting for is a reply that arrived after its request gave up, not a
+# sign that the controller pushes state.
+REQUEST_COMMANDS = ("sys_info", "login", "mplist", "op")
+
 class ReiriError(Exception):
     """Base exception for Reiri errors."""
     pass
@@ -23,8 +36,58 @@ class ReiriAuthError(ReiriError):
     """Exception for authentication failures."""
     pass
 
+class ReiriCircuitOpenError(ReiriConnectionError):
+    """Exception raised without contacting the controller while it is unreachable."""
+    pass
+
+class ReiriThrottledError(ReiriError):
+    """Exception raised when too many commands are waiting for the rate limit."""
+    pass
+
+class _OperateCall:
+    """An operate() caller waiting for every one of its points to be sent."""
+
+    __slots__ = ("future", "remaining", "result")
+
+    def __init__(self, future, command):
+        """Initialize."""
+        self.future = future
+        self.remaining = set(command)
+        self.result = None
+
+    def add_result(self, result):
+        """Merge the response for some of the points; resolve once all are in."""
+        if isinstance(self.result, dict) and isinstance(result, dict):
+            self.result.update(result)
+        elif isinstance(result, dict):
+            self.result = dict(result)
+        elif result is not None:
+            self.result = result
+        if not self.remaining and not self.future.done():
+            self.future.set_result(self.result)
+
 class ReiriClient:
-    def __init__(self, ip, username, password, port=52001, timeout=10):
+    def __init__(
+        self,
+        ip,
+        username,
+        password,
+        port=52001,
+        timeout=10,
+        batch_window=0.02,
+        debounce=0.5,
+        max_debounce=2.0,
+        offload_threshold=65536,
+        keepalive_interval=20,
+        max_in_flight=2,
+        dual_channel=False,
+        failure_threshold=2,
+        backoff_base=1,
+        backoff_max=60,
+        op_rate=5.0,
+        op_burst=10,
+        op_queue=20,
+    ):
         self.ip = ip
         self.port = port
         self.username = username
@@ -35,62 +98,178 @@ class ReiriClient:
         self.public_key = None
         self.common_key = None
         self.iv = None
-        self._lock = asyncio.Lock()
+        self._cipher = None
+        # Encrypted payloads at least this many hex characters long are
+        # decrypted and parsed in an executor instead of on the event loop.
+        self.offload_threshold = offload_threshold
+        self._connect_lock = asyncio.Lock()
+        self._reader_task = None
+        # An idle connection is pinged every keepalive_interval seconds; if the
+        # pong does not arrive within the request timeout the socket is treated
+        # as dead and re-established in the background.
+        self.keepalive_interval = keepalive_interval
+        self._keepalive_task = None
+        self._reconnect_task = None
+        self._last_received = None
+        # Set for good by close(); a closed client never reconnects
+        self._closed = False
+        # Circuit breaker: after failure_threshold failed reconnects in a row,
+        # requests fail fast and only the background prober contacts the
+        # controller, with jittered exponential backoff between attempts.
+        self.failure_threshold = failure_threshold
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.circuit_open = False
+        self.consecutive_failures = 0
+        self._retry_at = 0
+        # Timers and counters surfaced through diagnostics
+        self.metrics = ReiriMetrics()
+        # Requests are started by priority: interactive commands, then
+        # automation commands, then polls.
+        self.scheduler = RequestScheduler(self.metrics, max_in_flight)
+        # op messages are limited to op_rate per second after a burst of
+        # op_burst; at most op_queue may wait, further ones are rejected.
+        self.throttle = WriteThrottle(self.metrics, op_rate, op_burst, op_queue)
+        # A point list fetch shared by concurrent callers, and whether its
+        # request has left the scheduler queue yet.
+        self._poll_future = None
+        self._poll_task = None
+        self._poll_sent = False
+        # Requests awaiting a response, keyed by command name. The controller
+        # leaves the request id slot of the envelope empty, so responses to the
+        # same command are handed to waiters in the order they were sent.
+        self._pending = {}
+        # Callbacks for frames the controller sends without being asked.
+        self._push_listeners = []
+        # Callbacks run after the background task re-establishes the session
+        self._reconnect_listeners = []
+        self.last_push = None
         self.timeout = timeout
+        # Operate calls arriving within batch_window seconds of each other are
+        # merged into a single op message. Zero disables batching.
+        self.batch_window = batch_window
+        # Repeated commands for one point are held back this long so only the
+        # final value of a burst is written. Zero disables debouncing.
+        self.debounce = debounce
+        self.max_debounce = max_debounce
+        self._op_batch = {}
+        self._op_waiters = []
+        self._op_flush_handle = None
+        # Per-point state of queued operate calls: when the first value was
+        # queued, when the point is due to be sent, its most urgent priority,
+        # and when a command for it last went out.
+        self._op_first = {}
+        self._op_deadlines = {}
+        self._op_point_priority = {}
+        self._op_last_sent = {}
+        # In dual-channel mode op commands use a second, independently
+        # authenticated session so polls and commands never share a socket.
+        self._control = None
+        if dual_channel:
+            self._control = ReiriClient(
+                ip,
+                username,
+                password,
+                port,
+                timeout=timeout,
+                batch_window=batch_window,
+                debounce=debounce,
+                max_debounce=max_debounce,
+                offload_threshold=offload_threshold,
+                keepalive_interval=keepalive_interval,
+                max_in_flight=max_in_flight,
+                failure_threshold=failure_threshold,
+                backoff_base=backoff_base,
+                backoff_max=backoff_max,
+                op_rate=op_rate,
+                op_burst=op_burst,
+                op_queue=op_queue,
+            )
+            self._control.add_push_listener(self._handle_push)
+        self._op_tasks = set()
+        # Opt-in recorder of decrypted traffic; shared with the control
+        # session, whose messages are tagged with its channel name.
+        self.capture = None
+        self._capture_channel = None
+
+    @property
+    def control_channel(self):
+        """Return the client used for op commands in dual-channel mode, if any."""
+        return self._control
+
+    @property
+    def connected(self):
+        """Return True if the websocket is open and the handshake completed."""
+        return (
+            self.websocket is not None
+            and self.websocket.close_code is None
+            and self.common_key is not None
+        )
 
     async def connect(self):
         """Connect to the Reiri controller."""
         _LOGGER.debug(f"Initiating connection to {self.uri}")
+        start = time.perf_counter()
         try:
-            self.websocket = await asyncio.wait_for(websockets.connect(self.uri), timeout=self.timeout)
+            # Keepalive is handled by our own loop so it can trigger a
+            # background reconnect instead of only closing the socket.
+            self.websocket = await asyncio.wait_for(
+                websockets.connect(self.uri, ping_interval=None), timeout=self.timeout
+            )
             _LOGGER.info(f"Connected to {self.uri}")
             await self._handshake()
         except (asyncio.TimeoutError, OSError) as e:
-            _LOGGER.error(f"Failed to connect to {self.uri}: {e}")
+            # Only the first failures of an outage are worth an error
+            log = _LOGGER.debug if self.circuit_open else _LOGGER.error
+            log(f"Failed to connect to {self.uri}: {e}")
             raise ReiriConnectionError(f"Connection failed: {e}") from e
         except Exception as e:
             _LOGGER.exception(f"Unexpected error during connection: {e}")
             raise ReiriConnectionError(f"Unexpected connection error: {e}") from e
 
+        self.metrics.observe("connect", time.perf_counter() - start)
+        loop = asyncio.get_running_loop()
+        self._last_received = time.monotonic()
+        self._reader_task = loop.create_task(self._reader_loop(self.websocket))
+        if self.keepalive_interval:
+            self._keepalive_task = loop.create_task(self._keepalive_loop(self.websocket))
+        if self._control is not None and not self._control.connected:
+            # Bring the control session up alongside; from then on it
+            # reconnects on its own.
+            self._control._start_background_reconnect()
+
     async def _handshake(self):
         """Perform RSA handshake to exchange keys."""
         _LOGGER.debug("Starting handshake...")
+        start = time.perf_counter()
         try:
-            # Generate RSA Key Pair
-            self.private_key = rsa.generate_private_key(
-                public_exponent=65537,
-                key_size=2048,
-                backend=default_backend()
-            )
-            public_key = self.private_key.public_key()
-            pem_pkcs1 = public_key.public_bytes(
-                encoding=serialization.Encoding.PEM,
-                format=serialization.PublicFormat.PKCS1
-            ).decode('utf-8')
+            # Reuse the shared RSA keypair; it is generated off the event
+            # loop the first time and never regenerated on reconnect.
+            keypair = await async_get_keypair()
+            self.private_key = keypair.private_key
+            pem_pkcs1 = keypair.public_pem
 
             # Send Public Key
-            msg = [None, None, ["sys_info", pem_pkcs1]]
-            await self.websocket.send(json.dumps(msg))
+            await self.websocket.send(encode_frame(None, "sys_info", pem_pkcs1))
+            self._record("out", None, "sys_info", pem_pkcs1)
 
-            # Receive Common Key
+            # Receive Common Key. The reader task is not running yet, so the
+            # handshake reads the socket directly.
             while True:
                 response = await asyncio.wait_for(self.websocket.recv(), timeout=self.timeout)
-                data = json.loads(response)
-                if isinstance(data, list) and len(data) > 2 and isinstance(data[2], list):
-                    cmd = data[2][0]
-                    payload = data[2][1]
-                    if cmd == "sys_info" and isinstance(payload, dict) and "common_key" in payload:
-                        ciphertext = base64.b64decode(payload["common_key"])
-                        self.common_key = self.private_key.decrypt(
-                            ciphertext,
-                            asym_padding.OAEP(
-                                mgf=asym_padding.MGF1(algorithm=hashes.SHA1()),
-                                algorithm=hashes.SHA1(),
-                                label=None
-                            )
+                frame = decode_frame(response)
+                if frame is not None and frame.cmd == "sys_info":
+                    payload = frame.payload
+                    if isinstance(payload, dict) and "common_key" in payload:
+                        self._record("in", frame.kind, "sys_info", payload)
+                        loop = asyncio.get_running_loop()
+                        self.common_key = await loop.run_in_executor(
+                            None, keypair.decrypt_common_key, payload["common_key"]
                         )
                         self.iv = self.common_key
+                        self._cipher = SessionCipher(self.common_key)
                         _LOGGER.debug("Handshake successful, common key received")
+                        self.metrics.observe("handshake", time.perf_counter() - start)
                         break
         except asyncio.TimeoutError:
             _LOGGER.error("Handshake timed out")
@@ -99,6 +278,306 @@ class ReiriClient:
             _LOGGER.error(f"Handshake failed: {e}")
             raise ReiriAuthError(f"Handshake failed: {e}") from e
 
+    async def _reader_loop(self, websocket):
+        """Read frames from the websocket and route them to waiting requests."""
+        try:
+            async for response in websocket:
+                self._last_received = time.monotonic()
+                self.metrics.increment("bytes_received", len(response))
+                try:
+                    await self._dispatch(response)
+                except Exception as e:
+                    _LOGGER.warning(f"Failed to process frame from controller: {e}")
+        except websockets.exceptions.ConnectionClosed as e:
+            _LOGGER.info(f"Websocket connection closed by controller: {e}")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            _LOGGER.error(f"Websocket reader stopped unexpectedly: {e}")
+        finally:
+            # Only fail requests belonging to this socket; a newer connection
+            # may already be serving its own requests.
+            if self.websocket is websocket:
+                self._fail_pending(ReiriConnectionError("Connection closed"))
+                self._start_background_reconnect()
+
+    async def _keepalive_loop(self, websocket):
+        """Ping an idle connection and replace it if the controller stops answering."""
+        while self.websocket is websocket:
+            await asyncio.sleep(self.keepalive_interval)
+            if self.websocket is not websocket:
+                return
+            if time.monotonic() - self._last_received < self.keepalive_interval:
+                continue
+
+            try:
+                pong_waiter = await websocket.ping()
+                await asyncio.wait_for(pong_waiter, timeout=self.timeout)
+                self._last_received = time.monotonic()
+                continue
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                _LOGGER.warning(f"Controller did not answer keepalive ping: {e!r}")
+
+            async with self._connect_lock:
+                if self.websocket is websocket:
+                    await self._disconnect()
+            self._start_background_reconnect()
+            return
+
+    def _start_background_reconnect(self):
+        """Re-establish the session in the background after losing it."""
+        if self._closed or (self._reconnect_task and not self._reconnect_task.done()):
+            return
+        self._reconnect_task = asyncio.get_running_loop().create_task(
+            self._background_reconnect()
+        )
+
+    async def _background_reconnect(self):
+        """Reconnect and log in so the next request finds a warm socket.
+
+        While the circuit is open this is the only task that contacts the
+        controller; a successful attempt closes the circuit.
+        """
+        while not self._closed and not self.connected:
+            if self.circuit_open:
+                await asyncio.sleep(max(0, self._retry_at - time.monotonic()))
+            try:
+                async with self._connect_lock:
+                    if self._closed or self.connected:
+                        return
+                    await self._reconnect()
+                _LOGGER.info("Reconnected to controller in the background")
+                for listener in list(self._reconnect_listeners):
+                    try:
+                        listener()
+                    except Exception:
+                        _LOGGER.exception("Error in reconnect listener")
+                return
+            except ReiriError as e:
+                _LOGGER.debug(f"Background reconnect failed: {e}")
+            if not self.circuit_open:
+                await asyncio.sleep(self.backoff_base)
+
+    @property
+    def retry_in(self):
+        """Return seconds until the next reconnect attempt while the circuit is open."""
+        if not self.circuit_open:
+            return None
+        return max(0.0, self._retry_at - time.monotonic())
+
+    def _check_circuit(self):
+        """Fail fast while the controller is known to be unreachable."""
+        if self.circuit_open:
+            self.metrics.increment("circuit_rejections")
+            raise ReiriCircuitOpenError(
+                f"Controller unreachable; next reconnect attempt in {self.retry_in:.0f}s"
+            )
+
+    def _record_failure(self):
+        """Count a failed reconnect and open the circuit once the threshold is hit."""
+        self.consecutive_failures += 1
+        if self.consecutive_failures < self.failure_threshold:
+            return
+        exponent = self.consecutive_failures - self.failure_threshold
+        delay = min(self.backoff_max, self.backoff_base * 2 ** exponent)
+        # Full jitter over the upper half keeps several clients from
+        # reconnecting in lockstep when the hub comes back.
+        delay = random.uniform(delay / 2, delay)
+        self._retry_at = time.monotonic() + delay
+        if not self.circuit_open:
+            self.circuit_open = True
+            self.metrics.increment("circuit_opened")
+            _LOGGER.warning(
+                f"Controller unreachable after {self.consecutive_failures} attempts; "
+                f"failing requests fast and retrying in the background"
+            )
+        _LOGGER.debug(f"Next reconnect attempt in {delay:.1f}s")
+        self._start_background_reconnect()
+
+    def _record_success(self):
+        """Close the circuit after a successful reconnect."""
+        if self.circuit_open:
+            _LOGGER.info("Controller reachable again")
+        self.circuit_open = False
+        self.consecutive_failures = 0
+
+    async def _dispatch(self, response):
+        """Decode a frame once and resolve the oldest request waiting for it."""
+        frame = decode_frame(response)
+        if frame is None:
+            _LOGGER.debug(f"Ignoring unrecognised frame: {response[:200]}")
+            return
+
+        kind, _, cmd, payload = frame
+
+        waiters = self._pending.get(cmd)
+        future = None
+        while waiters:
+            candidate = waiters.popleft()
+            if not candidate.done():
+                future = candidate
+                break
+
+        try:
+            if kind == "enc" and isinstance(payload, str):
+                payload = await self._decrypt_json(payload)
+        except Exception as e:
+            if future is None:
+                raise
+            if not future.done():
+                future.set_exception(ReiriError(f"Failed to decode {cmd} response: {e}"))
+            return
+
+        self._record("in" if future is not None else "push", kind, cmd, payload)
+        if future is None:
+            self._handle_push(cmd, payload)
+            return
+
+        if not future.done():
+            future.set_result((kind, payload))
+
+    async def _decrypt_json(self, hex_ciphertext):
+        """Decrypt and parse a payload, offloading large ones to an executor."""
+        cipher = self._cipher
+        if cipher is None:
+            raise ReiriConnectionError("Not connected")
+        if len(hex_ciphertext) < self.offload_threshold:
+            with self.metrics.time("decrypt"):
+                plaintext = cipher.decrypt(hex_ciphertext)
+            with self.metrics.time("json_parse"):
+                return loads(plaintext)
+        loop = asyncio.get_running_loop()
+        with self.metrics.time("decode_offloaded"):
+            return await loop.run_in_executor(None, cipher.decrypt_json, hex_ciphertext)
+
+    def _handle_push(self, cmd, payload):
+        """Hand an unsolicited frame to the registered push listeners."""
+        if cmd in REQUEST_COMMANDS:
+            _LOGGER.debug(f"Late {cmd} reply from controller: {payload}")
+            self.metrics.increment("late_replies")
+            if cmd != "mplist":
+                return
+            # A late point list is still current data worth applying
+        else:
+            _LOGGER.debug(f"Unsolicited {cmd} frame from controller: {payload}")
+            self.last_push = time.monotonic()
+            self.metrics.increment("push_frames")
+        if cmd == "mplist" and self._poll_task is not None and not self._poll_sent:
+            # A full point list arrived while our own fetch was still queued;
+            # answer it with this one instead of asking again.
+            self.metrics.increment("polls_skipped")
+            self._poll_task.cancel()
+            if not self._poll_future.done():
+                self._poll_future.set_result(("enc", payload))
+            self._poll_future = None
+            self._poll_task = None
+        for listener in list(self._push_listeners):
+            try:
+                listener(cmd, payload)
+            except Exception:
+                _LOGGER.exception(f"Error in push listener for {cmd} frame")
+
+    def _record(self, direction, kind, cmd, payload):
+        """Pass a decrypted message to the capture recorder, if one is running."""
+        if self.capture is not None:
+            self.capture.record(direction, kind, cmd, payload, self._capture_channel)
+
+    async def start_capture(self, path):
+        """Record every decrypted message to ``path`` until ``stop_capture``.
+
+        Credentials and key material are redacted. In dual-channel mode the
+        control session is recorded to the same file.
+        """
+        if self.capture is not None:
+            raise ReiriError(f"Already capturing to {self.capture.path}")
+        recorder = CaptureRecorder(path)
+        await recorder.async_open()
+        self.capture = recorder
+        if self._control is not None:
+            self._control.capture = recorder
+            self._control._capture_channel = "control"
+        _LOGGER.info(f"Capturing controller traffic to {path}")
+
+    async def stop_capture(self):
+        """Stop recording and close the capture file; returns its path."""
+        recorder, self.capture = self.capture, None
+        if recorder is None:
+            return None
+        if self._control is not None:
+            self._control.capture = None
+        await recorder.async_close()
+        return recorder.path
+
+    def add_push_listener(self, listener):
+        """Register a callback for unsolicited frames; returns a remover."""
+        self._push_listeners.append(listener)
+
+        def remove_listener():
+            if listener in self._push_listeners:
+                self._push_listeners.remove(listener)
+
+        return remove_listener
+
+    def add_reconnect_listener(self, listener):
+        """Register a callback for background reconnects; returns a remover."""
+        self._reconnect_listeners.append(listener)
+
+        def remove_listener():
+            if listener in self._reconnect_listeners:
+                self._reconnect_listeners.remove(listener)
+
+        return remove_listener
+
+    def _fail_pending(self, exc):
+        """Fail every request still waiting for a response."""
+        pending, self._pending = self._pending, {}
+        for waiters in pending.values():
+            for future in waiters:
+                if not future.done():
+                    future.set_exception(exc)
+
+    async def _request(self, cmd, payload=None):
+        """Send an encrypted request and wait for the matching response.
+
+        ``payload`` is serialized to compact JSON and encrypted; ``None`` sends
+        the bare command.
+
+        Returns a ``(kind, payload)`` tuple where ``payload`` has already been
+        decrypted and parsed if the controller answered with an ``enc`` frame.
+        """
+        websocket = self.websocket
+        if websocket is None or self._reader_task is None or self._reader_task.done():
+            raise ReiriConnectionError("Not connected")
+
+        future = asyncio.get_running_loop().create_future()
+        waiters = self._pending.setdefault(cmd, collections.deque())
+        waiters.append(future)
+
+        encrypted = None if payload is None else self._encrypt(dumps(payload))
+        frame = encode_frame("enc", cmd, encrypted)
+        start = time.perf_counter()
+        try:
+            await websocket.send(frame)
+            self.metrics.increment("bytes_sent", len(frame))
+            self._record("out", "enc", cmd, payload)
+            result = await asyncio.wait_for(future, timeout=self.timeout)
+            # Round trip per command name: mplist, op, login
+            self.metrics.observe(cmd, time.perf_counter() - start)
+            return result
+        except asyncio.TimeoutError:
+            self.metrics.increment(f"{cmd}_timeouts")
+            _LOGGER.error(f"Timeout waiting for {cmd} response")
+            raise ReiriConnectionError(f"Timeout waiting for {cmd} response")
+        finally:
+            if not future.done():
+                future.cancel()
+            try:
+                waiters.remove(future)
+            except ValueError:
+                pass
+
     async def login(self):
         """Login to the controller."""
         if not self.common_key:
@@ -110,40 +589,24 @@ class ReiriClient:
             "passwd": self.password,
             "uuid": None
         }
-        # The controller expects compact JSON
-        login_data = json.dumps(payload).replace(" ", "")
-        
+
         try:
-            encrypted_payload = self._encrypt(login_data)
-            msg = ["enc", None, ["login", encrypted_payload]]
-            
-            await self.websocket.send(json.dumps(msg))
-            
-            # Wait for login response
-            start_time = asyncio.get_running_loop().time()
-            while (asyncio.get_running_loop().time() - start_time) < self.timeout:
-                try:
-                    response = await asyncio.wait_for(self.websocket.recv(), timeout=self.timeout)
-                except asyncio.TimeoutError:
-                     raise ReiriAuthError("Login response timeout")
-
-                if "login" in response:
-                    data = json.loads(response)
-                    if data[0] == "enc":
-                        decrypted = self._decrypt(data[2][1])
-                        resp_json = json.loads(decrypted)
-                        if resp_json.get("result") == "OK":
-                            _LOGGER.info("Login successful")
-                            return True
-                        else:
-                            _LOGGER.error(f"Login failed: {resp_json}")
-                            return False
-                    else:
-                         _LOGGER.warning(f"Received plain login response: {response}")
-                         return False
-            
-            raise ReiriAuthError("Login timed out awaiting correct response")
-            
+            try:
+                kind, resp_json = await self._request("login", payload)
+            except ReiriConnectionError as e:
+                raise ReiriAuthError(f"Login response timeout: {e}") from e
+
+            if kind != "enc":
+                _LOGGER.warning(f"Received plain login response: {resp_json}")
+                return False
+
+            if isinstance(resp_json, dict) and resp_json.get("result") == "OK":
+                _LOGGER.info("Login successful")
+                return True
+
+            _LOGGER.error(f"Login failed: {resp_json}")
+            return False
+
         except ReiriAuthError:
             raise
         except Exception as e:
@@ -151,124 +614,353 @@ class ReiriClient:
             raise ReiriAuthError(f"Login error: {e}") from e
 
     async def ensure_connected(self):
-        """Ensure that the connection is active and authenticated."""
-        if self.websocket and self.websocket.close_code is None:
+        """Ensure that the connection is active and authenticated.
+
+        Raises ``ReiriCircuitOpenError`` without contacting the controller
+        while the circuit is open, and ``ReiriConnectionError`` once the
+        client has been closed.
+        """
+        if self.connected:
             return
+        self._check_closed()
+        self._check_circuit()
+
+        # Concurrent callers share a single reconnect attempt.
+        start = time.perf_counter()
+        async with self._connect_lock:
+            self.metrics.observe("lock_wait", time.perf_counter() - start)
+            if self.connected:
+                return
+            # The attempt we waited for may have just opened the circuit
+            self._check_circuit()
+            await self._reconnect()
+
+    def _check_closed(self):
+        """Raise if close() was called; requests still queued must not reconnect."""
+        if self._closed:
+            raise ReiriConnectionError("Client is closed")
 
+    async def _reconnect(self):
+        """Replace the session; the caller holds the connect lock."""
+        self._check_closed()
         _LOGGER.info("Connection lost or not established. Reconnecting...")
-        await self.close()
-        
+        self.metrics.increment("reconnects")
+        await self._disconnect()
+
         try:
             await self.connect()
             if not await self.login():
-                 await self.close()
+                 await self._disconnect()
                  raise ReiriAuthError("Login failed during reconnection")
         except (ReiriConnectionError, ReiriAuthError) as e:
-            _LOGGER.error(f"Reconnection failed: {e}")
-            await self.close()
+            log = _LOGGER.debug if self.circuit_open else _LOGGER.error
+            log(f"Reconnection failed: {e}")
+            await self._disconnect()
+            self._record_failure()
             raise
         except Exception as e:
             _LOGGER.error(f"Reconnection failed with unexpected error: {e}")
-            await self.close()
+            await self._disconnect()
+            self._record_failure()
             raise ReiriConnectionError(f"Reconnection failed: {e}") from e
+        if self._closed:
+            # close() ran while the handshake was in progress
+            await self._disconnect()
+            raise ReiriConnectionError("Client is closed")
+        self._record_success()
+
+    async def _call(self, cmd, payload=None, priority=PRIORITY_AUTOMATION):
+        """Send a request once the scheduler lets a request of its priority start."""
+        async with self.scheduler.slot(priority):
+            return await self._call_with_retry(cmd, payload)
+
+    async def _call_with_retry(self, cmd, payload=None):
+        """Send a request, reconnecting and retrying once if the connection drops."""
+        websocket = self.websocket
+        try:
+            await self.ensure_connected()
+            websocket = self.websocket
+            return await self._request(cmd, payload)
+        except ReiriCircuitOpenError:
+            raise
+        except (websockets.exceptions.ConnectionClosed, BrokenPipeError, ReiriConnectionError):
+            if self._closed:
+                raise
+            _LOGGER.warning(f"Connection closed during {cmd}. Retrying...")
+            self.metrics.increment("retries")
+            # Force close and retry once. Another request may already have
+            # replaced the broken socket, in which case it is left alone.
+            async with self._connect_lock:
+                if self.websocket is websocket:
+                    await self._disconnect()
+            await self.ensure_connected()
+            return await self._request(cmd, payload)
 
     async def get_point_list(self):
-        """Get the list of points (devices)."""
-        async with self._lock:
-            try:
-                await self.ensure_connected()
-                return await self._get_point_list_internal()
-            except (websockets.exceptions.ConnectionClosed, BrokenPipeError, ReiriConnectionError):
-                _LOGGER.warning("Connection closed during get_point_list. Retrying...")
-                # Force close and retry once
-                await self.close()
-                await self.ensure_connected()
-                return await self._get_point_list_internal()
-            except Exception as e:
-                 _LOGGER.error(f"Error getting point list: {e}")
-                 raise
+        """Get the list of points (devices).
+
+        Concurrent callers share one fetch. A fetch still waiting in the
+        scheduler queue is dropped if the controller pushes a full point list
+        in the meantime.
+        """
+        if self._poll_future is None or self._poll_future.done():
+            self._poll_future = asyncio.get_running_loop().create_future()
+            self._poll_sent = False
+            self._poll_task = asyncio.get_running_loop().create_task(
+                self._fetch_point_list(self._poll_future)
+            )
+        else:
+            self.metrics.increment("polls_coalesced")
 
-    async def _get_point_list_internal(self):
-        msg = ["enc", None, ["mplist"]]
-        await self.websocket.send(json.dumps(msg))
-        
         try:
-            while True:
-                response = await asyncio.wait_for(self.websocket.recv(), timeout=self.timeout)
-                if "mplist" in response:
-                    data = json.loads(response)
-                    if data[0] == "enc":
-                        decrypted = self._decrypt(data[2][1])
-                        return json.loads(decrypted)
-                    return None
-        except asyncio.TimeoutError:
-            _LOGGER.error("Timeout waiting for point list")
-            raise ReiriConnectionError("Timeout waiting for point list")
+            kind, payload = await asyncio.shield(self._poll_future)
+        except ReiriCircuitOpenError:
+            raise
+        except Exception as e:
+            _LOGGER.error(f"Error getting point list: {e}")
+            raise
+        return payload if kind == "enc" else None
 
-    async def operate(self, command):
-        """Send an operation command."""
-        async with self._lock:
-            try:
-                await self.ensure_connected()
-                return await self._operate_internal(command)
-            except (websockets.exceptions.ConnectionClosed, BrokenPipeError, ReiriConnectionError):
-                _LOGGER.warning("Connection closed during operate. Retrying...")
-                # Force close and retry once
-                await self.close()
-                await self.ensure_connected()
-                return await self._operate_internal(command)
-            except Exception as e:
-                 _LOGGER.error(f"Error executing operation: {e}")
-                 raise
+    async def _fetch_point_list(self, future):
+        """Fetch the point list at poll priority and resolve ``future``."""
+        try:
+            async with self.scheduler.slot(PRIORITY_POLL):
+                self._poll_sent = True
+                result = await self._call_with_retry("mplist")
+        except asyncio.CancelledError:
+            if not future.done():
+                future.set_exception(ReiriConnectionError("Point list fetch cancelled"))
+            raise
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+        else:
+            if not future.done():
+                future.set_result(result)
+        finally:
+            if self._poll_future is future:
+                self._poll_future = None
+                self._poll_task = None
+            # Nobody may be waiting any more, e.g. after close()
+            if future.done() and not future.cancelled():
+                future.exception()
+
+    async def operate(self, command, priority=PRIORITY_INTERACTIVE):
+        """Send an operation command.
 
-    async def _operate_internal(self, command):
+        Commands for different points issued within ``batch_window`` are sent
+        together as one op message; each caller receives the part of the
+        response that concerns its own points. A batch is scheduled at the
+        most urgent priority of the calls it contains.
+
+        A value for a point and attribute that has not been sent yet is
+        replaced by a newer one. Once a command for a point has gone out,
+        further commands for that point are held for ``debounce`` seconds
+        (at most ``max_debounce`` in total) so a burst, such as dragging a
+        setpoint slider, ends in one final write. Callers whose values were
+        superseded receive the result of that write.
+
+        In dual-channel mode the command goes out over the control session.
+        """
         # command example: {"dtatcp1:1-00004": {"stat": "on"}}
-        cmd_str = json.dumps(command).replace(" ", "")
-        _LOGGER.info(f"Sending command: {cmd_str}")
-        encrypted = self._encrypt(cmd_str)
-        msg = ["enc", None, ["op", encrypted]]
-        await self.websocket.send(json.dumps(msg))
-        
-        # Wait for response
+        if self._control is not None:
+            return await self._control.operate(command, priority)
+        if not command or (self.batch_window <= 0 and self.debounce <= 0):
+            # Nothing to batch: an empty command would never be flushed
+            return await self._send_operate(command, priority)
+
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        for point_id, attrs in command.items():
+            queued = self._op_batch.get(point_id)
+            last_sent = self._op_last_sent.get(point_id)
+            if queued is None:
+                queued = self._op_batch[point_id] = {}
+                self._op_first[point_id] = now
+                self._op_point_priority[point_id] = priority
+                in_burst = last_sent is not None and now - last_sent < self.debounce
+            else:
+                superseded = len(queued.keys() & attrs.keys())
+                if superseded:
+                    self.metrics.increment("op_superseded", superseded)
+                self._op_point_priority[point_id] = min(self._op_point_priority[point_id], priority)
+                in_burst = True
+            queued.update(attrs)
+
+            if in_burst:
+                # Wait for the burst to settle, but not indefinitely
+                deadline = min(now + self.debounce, self._op_first[point_id] + self.max_debounce)
+            else:
+                deadline = now + self.batch_window
+            self._op_deadlines[point_id] = max(self._op_deadlines.get(point_id, 0), deadline)
+
+        call = _OperateCall(loop.create_future(), command)
+        self._op_waiters.append(call)
+        self._schedule_operate_flush()
+        return await call.future
+
+    def _schedule_operate_flush(self):
+        """Arm the flush timer for the earliest point deadline."""
+        if self._op_flush_handle is not None:
+            self._op_flush_handle.cancel()
+            self._op_flush_handle = None
+        if self._op_deadlines:
+            self._op_flush_handle = asyncio.get_running_loop().call_at(
+                min(self._op_deadlines.values()), self._flush_operate
+            )
+
+    def _flush_operate(self):
+        """Send the queued operate calls whose points are due."""
+        self._op_flush_handle = None
+        now = asyncio.get_running_loop().time()
+        # Points due within the batching window go out together
+        due = [
+            point_id for point_id, deadline in self._op_deadlines.items()
+            if deadline <= now + self.batch_window
+        ]
+        batch = {}
+        priority = PRIORITY_POLL
+        for point_id in due:
+            batch[point_id] = self._op_batch.pop(point_id)
+            del self._op_deadlines[point_id]
+            del self._op_first[point_id]
+            priority = min(priority, self._op_point_priority.pop(point_id))
+            self._op_last_sent[point_id] = now
+
+        waiters = []
+        for call in self._op_waiters:
+            point_ids = call.remaining.intersection(batch)
+            if point_ids:
+                call.remaining -= point_ids
+                waiters.append((call, point_ids))
+        self._op_waiters = [call for call in self._op_waiters if call.remaining]
+        self._schedule_operate_flush()
+        if not batch:
+            return
+
+        task = asyncio.get_running_loop().create_task(
+            self._send_operate_batch(batch, waiters, priority)
+        )
+        self._op_tasks.add(task)
+        task.add_done_callback(self._op_tasks.discard)
+
+    async def _send_operate_batch(self, batch, waiters, priority):
+        """Send a merged op message and fan the response out to its callers."""
+        if len(waiters) > 1:
+            _LOGGER.debug(f"Batching {len(waiters)} operate calls for {len(batch)} points")
         try:
-            while True:
-                response = await asyncio.wait_for(self.websocket.recv(), timeout=self.timeout)
-                if "op" in response:
-                    data = json.loads(response)
-                    if data[0] == "enc":
-                        decrypted = self._decrypt(data[2][1])
-                        _LOGGER.info(f"Operate response: {decrypted}")
-                        return json.loads(decrypted)
-                    return None
-        except asyncio.TimeoutError:
-            _LOGGER.error("Timeout waiting for operation response")
-            raise ReiriConnectionError("Timeout waiting for operation response")
+            result = await self._send_operate(batch, priority)
+        except asyncio.CancelledError:
+            # close() gave up on the batch
+            for call, _ in waiters:
+                if not call.future.done():
+                    call.future.set_exception(
+                        ReiriConnectionError("Client closed before the command was sent")
+                    )
+            raise
+        except Exception as e:
+            for call, _ in waiters:
+                if not call.future.done():
+                    call.future.set_exception(e)
+            return
+
+        for call, point_ids in waiters:
+            call.add_result(self._slice_operate_result(result, point_ids))
+
+    @staticmethod
+    def _slice_operate_result(result, point_ids):
+        """Return the part of an op response that concerns the given points."""
+        if isinstance(result, dict) and any(point_id in result for point_id in point_ids):
+            return {point_id: result[point_id] for point_id in point_ids if point_id in result}
+        return result
+
+    async def _send_operate(self, command, priority=PRIORITY_INTERACTIVE):
+        """Encrypt and send a single op message, subject to the rate limit."""
+        if not await self.throttle.acquire(priority):
+            _LOGGER.warning(f"Dropping command for {len(command)} point(s): command queue full")
+            raise ReiriThrottledError(
+                f"Too many commands waiting for the controller ({self.throttle.max_queue} queued, "
+                f"limit {self.throttle.rate:g} per second); command not sent"
+            )
+        _LOGGER.info(f"Sending command: {command}")
+        try:
+            kind, payload = await self._call("op", command, priority)
+        except ReiriCircuitOpenError:
+            raise
+        except Exception as e:
+            _LOGGER.error(f"Error executing operation: {e}")
+            raise
+        if kind != "enc":
+            return None
+        _LOGGER.info(f"Operate response: {payload}")
+        return payload
 
     def _encrypt(self, plaintext):
         """Encrypt data using AES-128-CBC."""
-        cipher = Cipher(algorithms.AES(self.common_key), modes.CBC(self.iv), backend=default_backend())
-        encryptor = cipher.encryptor()
-        padder = sym_padding.PKCS7(128).padder()
-        padded_data = padder.update(plaintext.encode('utf-8')) + padder.finalize()
-        ciphertext = encryptor.update(padded_data) + encryptor.finalize()
-        return ciphertext.hex()
+        return self._cipher.encrypt(plaintext)
 
     def _decrypt(self, hex_ciphertext):
         """Decrypt data using AES-128-CBC."""
-        ciphertext = bytes.fromhex(hex_ciphertext)
-        cipher = Cipher(algorithms.AES(self.common_key), modes.CBC(self.iv), backend=default_backend())
-        decryptor = cipher.decryptor()
-        padded_data = decryptor.update(ciphertext) + decryptor.finalize()
-        unpadder = sym_padding.PKCS7(128).unpadder()
-        plaintext = unpadder.update(padded_data) + unpadder.finalize()
-        return plaintext.decode('utf-8')
+        return self._cipher.decrypt(hex_ciphertext).decode('utf-8')
 
     async def close(self):
-        """Close the connection."""
-        if self.websocket:
+        """Close the connection and stop background reconnects."""
+        self._closed = True
+        await self._cancel_operates()
+        await _cancel_task(self._poll_task)
+        await _cancel_task(self._reconnect_task)
+        self._reconnect_task = None
+        await self.stop_capture()
+        await self._disconnect()
+        if self._control is not None:
+            await self._control.close()
+
+    async def _cancel_operates(self):
+        """Drop queued operate calls and stop the batches being sent."""
+        if self._op_flush_handle is not None:
+            self._op_flush_handle.cancel()
+            self._op_flush_handle = None
+        self._op_batch.clear()
+        self._op_first.clear()
+        self._op_deadlines.clear()
+        self._op_point_priority.clear()
+        waiters, self._op_waiters = self._op_waiters, []
+        for call in waiters:
+            if not call.future.done():
+                call.future.set_exception(
+                    ReiriConnectionError("Client closed before the command was sent")
+                )
+        for task in list(self._op_tasks):
+            await _cancel_task(task)
+
+    async def _disconnect(self):
+        """Close the current websocket and fail its outstanding requests."""
+        websocket, self.websocket = self.websocket, None
+        reader_task, self._reader_task = self._reader_task, None
+        keepalive_task, self._keepalive_task = self._keepalive_task, None
+        self.common_key = None
+        self.iv = None
+        self._cipher = None
+
+        if websocket:
             try:
-                await self.websocket.close()
+                await websocket.close()
                 _LOGGER.info("Websocket connection closed")
             except Exception:
                 pass
-            self.websocket = None
+
+        await _cancel_task(reader_task)
+        await _cancel_task(keepalive_task)
+
+        self._fail_pending(ReiriConnectionError("Connection closed"))
+
+
+async def _cancel_task(task):
+    """Cancel a background task and wait for it, unless it is the caller."""
+    if task is None or task.done() or task is asyncio.current_task():
+        return
+    task.cancel()
+    try:
+        await task
+    except (asyncio.CancelledError, Exception):
+        pass
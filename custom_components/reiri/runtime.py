@@ -0,0 +1,153 @@
+"""Running totals of unit run time derived from coordinator updates."""
+import time
+
+from homeassistant.components.climate.const import HVACMode
+
+
+class PointRuntime:
+    """Accumulated run time for one point, plus the state it is currently in."""
+
+    __slots__ = (
+        "compressor_s",
+        "on_s",
+        "mode_s",
+        "filter_since",
+        "compressor_on",
+        "mode",
+        "since",
+    )
+
+    def __init__(self, compressor_s=0.0, on_s=0.0, mode_s=None, filter_since=None):
+        """Initialize."""
+        self.compressor_s = compressor_s
+        self.on_s = on_s
+        self.mode_s = dict(mode_s or {})
+        # Wall clock time the filter flag was first seen on, if it is on
+        self.filter_since = filter_since
+        self.compressor_on = False
+        # HVAC mode while the unit is on, None while it is off
+        self.mode = None
+        # Monotonic start of the current segment; None while the state is unknown
+        self.since = None
+
+    def _fold(self, now):
+        """Add the current segment to the totals and start a new one at ``now``."""
+        if self.since is not None:
+            elapsed = now - self.since
+            if self.compressor_on:
+                self.compressor_s += elapsed
+            if self.mode is not None:
+                self.on_s += elapsed
+                self.mode_s[self.mode] = self.mode_s.get(self.mode, 0.0) + elapsed
+        self.since = now
+
+    def observe(self, point, now, wall):
+        """Close the current segment and continue in the state of ``point``."""
+        self._fold(now)
+        self.compressor_on = point.compressor_running
+        self.mode = None if point.hvac_mode == HVACMode.OFF else str(point.hvac_mode)
+        if not point.filter_alert:
+            self.filter_since = None
+        elif self.filter_since is None:
+            self.filter_since = wall
+
+    def pause(self, now):
+        """Stop accumulating until the point is observed again."""
+        self._fold(now)
+        self.since = None
+
+    def _live(self, active, now):
+        """Return the seconds of the current segment if ``active``."""
+        return now - self.since if active and self.since is not None else 0.0
+
+    def compressor_seconds(self, now):
+        """Return total compressor run time."""
+        return self.compressor_s + self._live(self.compressor_on, now)
+
+    def on_seconds(self, now):
+        """Return total time the unit was on."""
+        return self.on_s + self._live(self.mode is not None, now)
+
+    def mode_seconds(self, mode, now):
+        """Return total time spent in ``mode`` while on."""
+        return self.mode_s.get(mode, 0.0) + self._live(self.mode == mode, now)
+
+    def filter_seconds(self, wall):
+        """Return time since the filter flag went on, or 0 if it is off."""
+        return wall - self.filter_since if self.filter_since is not None else 0.0
+
+    def as_dict(self, now):
+        """Return the totals up to ``now`` in a JSON-serialisable form."""
+        modes = set(self.mode_s)
+        if self.mode is not None:
+            modes.add(self.mode)
+        return {
+            "compressor_s": self.compressor_seconds(now),
+            "on_s": self.on_seconds(now),
+            "mode_s": {mode: self.mode_seconds(mode, now) for mode in modes},
+            "filter_since": self.filter_since,
+        }
+
+
+class RuntimeTracker:
+    """Accumulate compressor, on and per-mode time and filter age per point.
+
+    Each point keeps its totals up to the start of its current segment and
+    the state it has been in since. An update only closes the segments of
+    points whose data changed, and reading a total adds the open segment, so
+    the work per coordinator update grows with the changed points rather than
+    the number of units.
+    """
+
+    def __init__(self):
+        """Initialize."""
+        self._points = {}
+        # Re-observe every point on the next update, e.g. after an outage
+        self._resync = True
+
+    def get(self, point_id):
+        """Return the runtime record for a point, if it has been observed."""
+        return self._points.get(point_id)
+
+    def update(self, points, changed):
+        """Account for a coordinator update with parsed ``points``."""
+        now = time.monotonic()
+        wall = time.time()
+        if self._resync or len(self._points) < len(points):
+            changed = set(points) if self._resync else changed | (points.keys() - self._points.keys())
+            self._resync = False
+        for point_id in changed:
+            point = points.get(point_id)
+            runtime = self._points.get(point_id)
+            if point is None:
+                if runtime is not None:
+                    runtime.pause(now)
+                continue
+            if runtime is None:
+                runtime = self._points[point_id] = PointRuntime()
+            runtime.observe(point, now, wall)
+
+    def pause(self):
+        """Stop accumulating while the controller's state is unknown."""
+        if self._resync:
+            return
+        now = time.monotonic()
+        for runtime in self._points.values():
+            runtime.pause(now)
+        self._resync = True
+
+    def load(self, data):
+        """Restore totals saved by ``as_dict``."""
+        for point_id, totals in (data or {}).items():
+            self._points[point_id] = PointRuntime(
+                totals.get("compressor_s", 0.0),
+                totals.get("on_s", 0.0),
+                totals.get("mode_s"),
+                totals.get("filter_since"),
+            )
+        self._resync = True
+
+    def as_dict(self):
+        """Return all totals in a JSON-serialisable form."""
+        now = time.monotonic()
+        return {point_id: runtime.as_dict(now) for point_id, runtime in self._points.items()}
@@ -0,0 +1,130 @@
+"""Priority scheduling of requests sent to the Reiri controller."""
+import asyncio
+import collections
+import time
+from contextlib import asynccontextmanager
+
+# Priority classes, most urgent first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_AUTOMATION = 1
+PRIORITY_POLL = 2
+PRIORITY_NAMES = ("interactive", "automation", "poll")
+
+
+class RequestScheduler:
+    """Hand out a limited number of in-flight request slots by priority.
+
+    Interactive commands are served first, then automation commands, then
+    polls. Polls never hold every slot, so a command does not queue behind a
+    slow ``mplist`` on our side; likewise commands leave a slot for a waiting
+    poll, so telemetry keeps flowing during a command storm. A request that
+    has waited longer than ``max_wait`` seconds is served next whatever its
+    class, so a busy automation cannot starve polling.
+    """
+
+    def __init__(self, metrics, max_in_flight=2, max_wait=15):
+        """Initialize."""
+        self.metrics = metrics
+        self.max_in_flight = max_in_flight
+        self.max_wait = max_wait
+        self.in_flight = 0
+        self.polls_in_flight = 0
+        # Waiting (future, enqueued_at) pairs per priority class
+        self._queues = tuple(collections.deque() for _ in PRIORITY_NAMES)
+        self.max_depth = [0] * len(PRIORITY_NAMES)
+
+    def depth(self, priority=None):
+        """Return the number of queued requests, for one class or in total."""
+        if priority is None:
+            return sum(len(queue) for queue in self._queues)
+        return len(self._queues[priority])
+
+    @asynccontextmanager
+    async def slot(self, priority):
+        """Wait for an in-flight slot and hold it for the enclosed block."""
+        start = time.perf_counter()
+        if self._has_capacity(priority) and not any(self._queues[:priority + 1]):
+            self._acquire(priority)
+        else:
+            await self._wait(priority)
+        self.metrics.observe(f"queue_wait_{PRIORITY_NAMES[priority]}", time.perf_counter() - start)
+        try:
+            yield
+        finally:
+            self._release(priority)
+
+    async def _wait(self, priority):
+        """Queue behind requests of the same or higher priority."""
+        future = asyncio.get_running_loop().create_future()
+        entry = (future, time.monotonic())
+        queue = self._queues[priority]
+        queue.append(entry)
+        self.max_depth[priority] = max(self.max_depth[priority], len(queue))
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The slot was handed over just as the caller gave up
+                self._release(priority)
+            elif entry in queue:
+                queue.remove(entry)
+            raise
+
+    def _has_capacity(self, priority, overdue=False):
+        """Return True if a request of this class may start now."""
+        if self.in_flight >= self.max_in_flight:
+            return False
+        if overdue or self.max_in_flight < 2:
+            return True
+        # Each side keeps one slot out of the other's reach
+        reserve = self.max_in_flight - 1
+        if priority == PRIORITY_POLL:
+            return self.polls_in_flight < reserve
+        if self._queues[PRIORITY_POLL] and self.polls_in_flight < reserve:
+            return self.in_flight - self.polls_in_flight < reserve
+        return True
+
+    def _acquire(self, priority):
+        self.in_flight += 1
+        if priority == PRIORITY_POLL:
+            self.polls_in_flight += 1
+
+    def _release(self, priority):
+        """Free a slot and hand free slots to the next eligible waiters."""
+        self.in_flight -= 1
+        if priority == PRIORITY_POLL:
+            self.polls_in_flight -= 1
+        while True:
+            priority = self._next_priority()
+            if priority is None:
+                return
+            future, _ = self._queues[priority].popleft()
+            if not future.done():
+                self._acquire(priority)
+                future.set_result(None)
+
+    def _next_priority(self):
+        """Return the class whose oldest request should start next, if any may."""
+        now = time.monotonic()
+        overdue = [
+            (queue[0][1], priority)
+            for priority, queue in enumerate(self._queues)
+            if queue and now - queue[0][1] > self.max_wait
+        ]
+        if overdue:
+            _, priority = min(overdue)
+            return priority if self._has_capacity(priority, overdue=True) else None
+        for priority, queue in enumerate(self._queues):
+            if queue and self._has_capacity(priority):
+                return priority
+        return None
+
+    def as_dict(self):
+        """Return a JSON-serialisable snapshot of the queues."""
+        return {
+            "in_flight": self.in_flight,
+            "polls_in_flight": self.polls_in_flight,
+            "max_in_flight": self.max_in_flight,
+            "queue_depth": {name: len(queue) for name, queue in zip(PRIORITY_NAMES, self._queues)},
+            "max_queue_depth": dict(zip(PRIORITY_NAMES, self.max_depth)),
+        }
@@ -1,17 +1,267 @@
 """Sensor platform for Reiri."""
+from collections.abc import Callable
+from dataclasses import dataclass
 import logging
+import time
+from typing import Any
 
-from homeassistant.components.sensor import SensorEntity, SensorDeviceClass, SensorStateClass
-from homeassistant.const import UnitOfTemperature
+from homeassistant.components.sensor import (
+    SensorEntity,
+    SensorEntityDescription,
+    SensorDeviceClass,
+    SensorStateClass,
+)
+from homeassistant.const import EntityCategory, UnitOfTemperature, UnitOfTime
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.components.climate.const import HVACMode
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import DOMAIN
+from .const import DOMAIN, RUNTIME_REFRESH_INTERVAL
 from .entity import ReiriEntity
+from .models import REIRI_TO_HA_MODE, ReiriPoint
 
 _LOGGER = logging.getLogger(__name__)
 
+
+def _op_client(coordinator):
+    """Return the session that sends commands; the control one in dual-channel mode."""
+    return coordinator.client.control_channel or coordinator.client
+
+
+def _timer_last(name, client_fn=lambda coordinator: coordinator.client):
+    """Return a value function reading the last sample of a client timer."""
+    def value_fn(coordinator):
+        timer = client_fn(coordinator).metrics.timer(name)
+        return round(timer.last, 1) if timer and timer.last is not None else None
+    return value_fn
+
+
+def _op_counter(coordinator, name):
+    """Return a counter of the session that sends commands."""
+    return _op_client(coordinator).metrics.counters.get(name, 0)
+
+
+def _confirmation_median(coordinator):
+    stats = coordinator.pending.latency_stats()
+    return round(stats["median"], 1) if stats else None
+
+
+@dataclass(frozen=True, kw_only=True)
+class ReiriMetricSensorDescription(SensorEntityDescription):
+    """Describes a controller performance sensor."""
+
+    value_fn: Callable[[Any], Any]
+
+
+METRIC_SENSORS = (
+    ReiriMetricSensorDescription(
+        key="mplist_latency",
+        name="Reiri Point List Latency",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=_timer_last("mplist"),
+    ),
+    ReiriMetricSensorDescription(
+        key="op_latency",
+        name="Reiri Command Latency",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=_timer_last("op", _op_client),
+    ),
+    ReiriMetricSensorDescription(
+        key="handshake_time",
+        name="Reiri Handshake Time",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=_timer_last("handshake"),
+    ),
+    ReiriMetricSensorDescription(
+        key="refresh_duration",
+        name="Reiri Refresh Duration",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=_timer_last("refresh"),
+    ),
+    ReiriMetricSensorDescription(
+        key="reconnects",
+        name="Reiri Reconnects",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda coordinator: coordinator.client.metrics.counters.get("reconnects", 0),
+    ),
+    ReiriMetricSensorDescription(
+        key="throttled_commands",
+        name="Reiri Throttled Commands",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda coordinator: _op_counter(coordinator, "op_throttled"),
+    ),
+    ReiriMetricSensorDescription(
+        key="dropped_commands",
+        name="Reiri Dropped Commands",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda coordinator: _op_counter(coordinator, "op_dropped"),
+    ),
+    ReiriMetricSensorDescription(
+        key="poll_interval",
+        name="Reiri Poll Interval",
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        value_fn=lambda coordinator: coordinator.update_interval.total_seconds(),
+    ),
+    ReiriMetricSensorDescription(
+        key="confirmation_latency",
+        name="Reiri Command Confirmation Latency",
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=_confirmation_median,
+    ),
+)
+
+
+@dataclass(frozen=True, kw_only=True)
+class ReiriPointSensorDescription(SensorEntityDescription):
+    """Describes a sensor showing one field of a unit."""
+
+    # mplist key a unit must report for the sensor to be created
+    raw_key: str
+    value_fn: Callable[[ReiriPoint], Any]
+
+
+def _temperature_description(key, name, value_fn, **kwargs):
+    return ReiriPointSensorDescription(
+        key=key,
+        name=name,
+        raw_key=key,
+        device_class=SensorDeviceClass.TEMPERATURE,
+        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=value_fn,
+        **kwargs,
+    )
+
+
+# Values come from the ReiriPoint records, which the coordinator parses once
+# per refresh and only for units whose data changed. Sensors duplicating what
+# the climate entity shows are disabled by default.
+POINT_SENSORS = (
+    _temperature_description(
+        "otemp",
+        "Outdoor Temperature",
+        lambda point: point.outdoor_temperature,
+    ),
+    _temperature_description(
+        "temp",
+        "Room Temperature",
+        lambda point: point.room_temperature,
+    ),
+    _temperature_description(
+        "sp",
+        "Setpoint",
+        lambda point: point.setpoint,
+        entity_registry_enabled_default=False,
+    ),
+    _temperature_description(
+        "csp",
+        "Cooling Setpoint",
+        lambda point: point.cool_setpoint,
+        entity_registry_enabled_default=False,
+    ),
+    _temperature_description(
+        "hsp",
+        "Heating Setpoint",
+        lambda point: point.heat_setpoint,
+        entity_registry_enabled_default=False,
+    ),
+    ReiriPointSensorDescription(
+        key="mode",
+        name="Mode",
+        raw_key="mode",
+        device_class=SensorDeviceClass.ENUM,
+        options=[str(HVACMode.OFF), *(str(mode) for mode in REIRI_TO_HA_MODE.values())],
+        entity_registry_enabled_default=False,
+        value_fn=lambda point: str(point.hvac_mode),
+    ),
+    ReiriPointSensorDescription(
+        key="fanstep",
+        name="Fan Speed",
+        raw_key="fanstep",
+        entity_registry_enabled_default=False,
+        value_fn=lambda point: point.fan_mode,
+    ),
+    ReiriPointSensorDescription(
+        key="flap",
+        name="Flap",
+        raw_key="flap",
+        entity_registry_enabled_default=False,
+        value_fn=lambda point: point.swing_mode,
+    ),
+    ReiriPointSensorDescription(
+        key="err",
+        name="Error Code",
+        raw_key="err",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=lambda point: point.error_code,
+    ),
+)
+
+
+@dataclass(frozen=True, kw_only=True)
+class ReiriRuntimeSensorDescription(SensorEntityDescription):
+    """Describes a run time total kept for each unit."""
+
+    # mplist key a unit must report for the sensor to be created
+    raw_key: str
+    # Returns seconds from a PointRuntime, the monotonic and the wall clock time
+    value_fn: Callable[[Any, float, float], float]
+
+
+def _runtime_description(key, name, raw_key, value_fn, **kwargs):
+    return ReiriRuntimeSensorDescription(
+        key=key,
+        name=name,
+        raw_key=raw_key,
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.HOURS,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        suggested_display_precision=1,
+        value_fn=value_fn,
+        **kwargs,
+    )
+
+
+RUNTIME_SENSORS = (
+    _runtime_description(
+        "compressor_hours",
+        "Compressor Run Time",
+        "thermo",
+        lambda runtime, now, wall: runtime.compressor_seconds(now),
+    ),
+    _runtime_description(
+        "on_hours",
+        "Run Time",
+        "stat",
+        lambda runtime, now, wall: runtime.on_seconds(now),
+    ),
+    _runtime_description(
+        "filter_hours",
+        "Time Since Filter Alert",
+        "filter",
+        lambda runtime, now, wall: runtime.filter_seconds(wall),
+    ),
+)
+
+
+def _mode_runtime_description(mode):
+    """Describe the time-in-mode sensor for an HVAC mode; disabled by default."""
+    return _runtime_description(
+        f"{mode}_hours",
+        f"{mode.replace('_', ' ').title()} Run Time",
+        "stat",
+        lambda runtime, now, wall: runtime.mode_seconds(mode, now),
+        entity_registry_enabled_default=False,
+    )
+
+
 async def async_setup_entry(
     hass: HomeAssistant,
     entry: ConfigEntry,
@@ -22,35 +272,106 @@ async def async_setup_entry(
     coordinator = data["coordinator"]
     client = data["client"]
 
-    if not coordinator.data:
-        return
+    entities = [
+        ReiriMetricSensor(coordinator, entry, description)
+        for description in METRIC_SENSORS
+    ]
 
-    entities = []
-    for point_id, point_data in coordinator.data.items():
-        if "otemp" in point_data:
-            entities.append(ReiriOutdoorTempSensor(coordinator, client, point_id))
+    for point_id, point in coordinator.points.items():
+        entities.extend(
+            ReiriPointSensor(coordinator, client, point_id, description)
+            for description in POINT_SENSORS
+            if description.raw_key in point.raw
+        )
+
+        descriptions = list(RUNTIME_SENSORS)
+        descriptions.extend(
+            _mode_runtime_description(str(mode))
+            for mode in point.capabilities.hvac_modes
+            if mode != HVACMode.OFF
+        )
+        entities.extend(
+            ReiriRuntimeSensor(coordinator, client, point_id, description)
+            for description in descriptions
+            if description.raw_key in point.raw
+        )
 
     async_add_entities(entities)
 
 
-class ReiriOutdoorTempSensor(ReiriEntity, SensorEntity):
-    """Outdoor Temperature Sensor."""
+class ReiriPointSensor(ReiriEntity, SensorEntity):
+    """Sensor for one field of a unit, described by its entity description."""
 
-    _attr_device_class = SensorDeviceClass.TEMPERATURE
-    _attr_state_class = SensorStateClass.MEASUREMENT
-    _attr_native_unit_of_measurement = UnitOfTemperature.CELSIUS
+    entity_description: ReiriPointSensorDescription
 
-    def __init__(self, coordinator, client, point_id):
+    def __init__(self, coordinator, client, point_id, description):
         """Initialize."""
         super().__init__(coordinator, client, point_id)
+        self.entity_description = description
         # Use point_id + suffix for unique ID
-        self._attr_unique_id = f"{point_id}_otemp"
-        self._attr_name = f"{coordinator.data[point_id].get('name', point_id)} Outdoor Temperature"
+        self._attr_unique_id = f"{point_id}_{description.key}"
+        self._attr_name = f"{coordinator.data[point_id].get('name', point_id)} {description.name}"
+        self._update_attrs()
+
+    def _update_attrs(self):
+        """Read the value from the parsed point record."""
+        point = self.point
+        self._attr_native_value = self.entity_description.value_fn(point) if point else None
+
+
+class ReiriRuntimeSensor(ReiriEntity, SensorEntity):
+    """Run time total for one unit, maintained by the coordinator."""
+
+    entity_description: ReiriRuntimeSensorDescription
+
+    def __init__(self, coordinator, client, point_id, description):
+        """Initialize."""
+        super().__init__(coordinator, client, point_id)
+        self.entity_description = description
+        self._attr_unique_id = f"{point_id}_{description.key}"
+        self._attr_name = f"{coordinator.data[point_id].get('name', point_id)} {description.name}"
+        self._written = None
+
+    def _should_update(self):
+        """Also rewrite periodically while a total keeps growing."""
+        return super()._should_update() or (
+            self._written is not None
+            and time.monotonic() - self._written >= RUNTIME_REFRESH_INTERVAL
+        )
+
+    def _update_attrs(self):
+        """Compute the total at write time."""
+        runtime = self.coordinator.runtime.get(self._point_id)
+        if runtime is None:
+            self._attr_native_value = None
+            return
+        now = time.monotonic()
+        seconds = self.entity_description.value_fn(runtime, now, time.time())
+        self._attr_native_value = round(seconds / 3600, 3)
+        self._written = now
+
+    async def async_added_to_hass(self):
+        """Compute the initial value."""
+        await super().async_added_to_hass()
+        self._update_attrs()
+
+
+class ReiriMetricSensor(CoordinatorEntity, SensorEntity):
+    """Diagnostic performance sensor on the controller device."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+
+    entity_description: ReiriMetricSensorDescription
+
+    def __init__(self, coordinator, entry, description):
+        """Initialize."""
+        super().__init__(coordinator)
+        self.entity_description = description
+        self._attr_unique_id = f"{entry.entry_id}_{description.key}"
+        self._attr_device_info = {"identifiers": {(DOMAIN, "controller")}}
 
     @property
     def native_value(self):
-        """Return the state of the sensor."""
-        point_data = self.coordinator.data.get(self._point_id, {})
-        val = point_data.get("otemp")
-        # According to logs, otemp is an integer like 30 or 31
-        return val
+        """Return the current metric value."""
+        return self.entity_description.value_fn(self.coordinator)
@@ -0,0 +1,244 @@
+"""Services for the Reiri integration."""
+import asyncio
+import logging
+
+import voluptuous as vol
+
+from homeassistant.core import HomeAssistant, ServiceCall, SupportsResponse, callback
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.event import async_call_later
+from homeassistant.util import dt as dt_util
+
+from .const import BULK_OPERATE_CHUNK_SIZE, DOMAIN
+from .models import REIRI_TO_HA_FAN, REIRI_TO_HA_MODE, expected_point_values, point_result
+from .reiri_client import ReiriError
+from .scheduler import PRIORITY_AUTOMATION, PRIORITY_INTERACTIVE
+
+_LOGGER = logging.getLogger(__name__)
+
+SERVICE_BULK_OPERATE = "bulk_operate"
+SERVICE_START_CAPTURE = "start_capture"
+SERVICE_STOP_CAPTURE = "stop_capture"
+
+ATTR_POINTS = "points"
+ATTR_AREA_ID = "area_id"
+ATTR_ALL = "all"
+ATTR_DURATION = "duration"
+
+# Controller keys accepted in an op command
+OPERATE_ATTRS = ("stat", "mode", "sp", "fanstep", "flap")
+
+
+def _flap(value):
+    """Validate a flap value: "S" for swing or a position from 0 to 4."""
+    if str(value).upper() == "S":
+        return "S"
+    return vol.All(vol.Coerce(int), vol.Range(min=0, max=4))(value)
+
+
+BULK_OPERATE_SCHEMA = vol.All(
+    vol.Schema(
+        {
+            vol.Optional(ATTR_POINTS): vol.All(cv.ensure_list, [cv.string]),
+            vol.Optional(ATTR_AREA_ID): vol.All(cv.ensure_list, [cv.string]),
+            vol.Optional(ATTR_ALL): cv.boolean,
+            vol.Optional("stat"): vol.In(["on", "off"]),
+            vol.Optional("mode"): vol.In(list(REIRI_TO_HA_MODE)),
+            vol.Optional("sp"): vol.Coerce(float),
+            vol.Optional("fanstep"): vol.In(list(REIRI_TO_HA_FAN)),
+            vol.Optional("flap"): _flap,
+        }
+    ),
+    cv.has_at_least_one_key(*OPERATE_ATTRS),
+)
+
+START_CAPTURE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_DURATION): vol.All(vol.Coerce(int), vol.Range(min=1, max=86400)),
+    }
+)
+
+
+@callback
+def async_setup_services(hass: HomeAssistant):
+    """Register the integration's services."""
+
+    async def async_bulk_operate(call: ServiceCall):
+        return await _async_bulk_operate(hass, call)
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_BULK_OPERATE,
+        async_bulk_operate,
+        schema=BULK_OPERATE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    async def async_start_capture(call: ServiceCall):
+        return await _async_start_capture(hass, call)
+
+    async def async_stop_capture(call: ServiceCall):
+        return await _async_stop_capture(hass)
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_START_CAPTURE,
+        async_start_capture,
+        schema=START_CAPTURE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_STOP_CAPTURE,
+        async_stop_capture,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+
+def _loaded_entries(hass):
+    """Return (entry, runtime data) for every loaded Reiri entry."""
+    loaded = []
+    for entry in hass.config_entries.async_entries(DOMAIN):
+        data = hass.data.get(DOMAIN, {}).get(entry.entry_id)
+        if data is not None:
+            loaded.append((entry, data))
+    return loaded
+
+
+def _area_point_ids(hass, entry, area_ids):
+    """Return the ids of an entry's climate points placed in ``area_ids``."""
+    entity_registry = er.async_get(hass)
+    device_registry = dr.async_get(hass)
+    point_ids = set()
+    for entity in er.async_entries_for_config_entry(entity_registry, entry.entry_id):
+        if entity.domain != "climate":
+            continue
+        area_id = entity.area_id
+        if area_id is None and entity.device_id:
+            device = device_registry.async_get(entity.device_id)
+            area_id = device.area_id if device else None
+        if area_id in area_ids:
+            point_ids.add(entity.unique_id)
+    return point_ids
+
+
+def _resolve_point_ids(hass, requested):
+    """Map climate entity ids to point ids; other values are taken as point ids."""
+    entity_registry = er.async_get(hass)
+    point_ids = set()
+    for value in requested:
+        entity = entity_registry.async_get(value) if value.startswith("climate.") else None
+        if entity is not None and entity.platform == DOMAIN:
+            point_ids.add(entity.unique_id)
+        else:
+            point_ids.add(value)
+    return point_ids
+
+
+async def _async_bulk_operate(hass, call):
+    """Send one op command to many points and report the outcome per point."""
+    attrs = {key: call.data[key] for key in OPERATE_ATTRS if key in call.data}
+    requested = _resolve_point_ids(hass, call.data.get(ATTR_POINTS, []))
+    area_ids = set(call.data.get(ATTR_AREA_ID, []))
+    select_all = call.data.get(ATTR_ALL, False)
+    if not (requested or area_ids or select_all):
+        raise ServiceValidationError("Specify points, area_id or all")
+
+    priority = PRIORITY_INTERACTIVE if call.context.user_id else PRIORITY_AUTOMATION
+    results = {}
+    jobs = []
+    for entry, data in _loaded_entries(hass):
+        coordinator = data["coordinator"]
+        if select_all:
+            point_ids = set(coordinator.points)
+        else:
+            point_ids = (requested | _area_point_ids(hass, entry, area_ids)) & set(coordinator.points)
+        requested -= point_ids
+        if point_ids:
+            jobs.append(_async_operate_points(
+                coordinator, data["client"], sorted(point_ids), attrs, priority
+            ))
+
+    for point_id in requested:
+        results[point_id] = "unknown point"
+
+    for job_results in await asyncio.gather(*jobs):
+        results.update(job_results)
+
+    failed = sorted(point_id for point_id, result in results.items() if result != "OK")
+    if failed:
+        _LOGGER.warning(f"Bulk operate failed for {len(failed)} of {len(results)} points: {failed}")
+    return {"results": results, "failed": failed}
+
+
+async def _async_operate_points(coordinator, client, point_ids, attrs, priority):
+    """Apply ``attrs`` optimistically to ``point_ids`` and send them in chunks."""
+    pending = {}
+    for point_id in point_ids:
+        values = expected_point_values(coordinator.points[point_id], attrs)
+        pending[point_id] = [
+            coordinator.pending.add(point_id, attr, value) for attr, value in values.items()
+        ]
+    coordinator.async_update_points(point_ids)
+    coordinator.async_note_command()
+
+    results = {}
+    for start in range(0, len(point_ids), BULK_OPERATE_CHUNK_SIZE):
+        chunk = point_ids[start:start + BULK_OPERATE_CHUNK_SIZE]
+        try:
+            response = await client.operate(
+                {point_id: dict(attrs) for point_id in chunk}, priority
+            )
+        except Exception as e:
+            for point_id in chunk:
+                results[point_id] = str(e) or type(e).__name__
+            continue
+        for point_id in chunk:
+            results[point_id] = point_result(response, point_id)
+
+    # Roll failed points back to the controller's state in one pass
+    failed = [point_id for point_id, result in results.items() if result != "OK"]
+    for point_id in failed:
+        for command in pending[point_id]:
+            coordinator.pending.fail(command)
+    if failed:
+        coordinator.async_update_points(failed)
+    return results
+
+
+async def _async_start_capture(hass, call):
+    """Start recording each controller's traffic to a file in the config directory."""
+    stamp = dt_util.now().strftime("%Y%m%d_%H%M%S")
+    duration = call.data.get(ATTR_DURATION)
+    files = {}
+    for entry, data in _loaded_entries(hass):
+        client = data["client"]
+        path = hass.config.path(f"{DOMAIN}_capture_{entry.entry_id}_{stamp}.jsonl")
+        try:
+            await client.start_capture(path)
+        except (ReiriError, OSError) as e:
+            raise ServiceValidationError(f"Cannot start capture: {e}") from e
+        files[entry.entry_id] = path
+        if duration:
+            recorder = client.capture
+
+            async def _async_stop(_now, client=client, recorder=recorder):
+                # Leave a capture started again since then alone
+                if client.capture is recorder:
+                    await client.stop_capture()
+
+            async_call_later(hass, duration, _async_stop)
+    return {"files": files}
+
+
+async def _async_stop_capture(hass):
+    """Stop every running capture and return the files written."""
+    files = {}
+    for entry, data in _loaded_entries(hass):
+        path = await data["client"].stop_capture()
+        if path is not None:
+            files[entry.entry_id] = path
+    return {"files": files}
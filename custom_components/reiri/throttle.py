@@ -0,0 +1,121 @@
+"""Rate limiting of commands sent to the Reiri controller."""
+import asyncio
+import heapq
+import itertools
+import time
+
+
+class WriteThrottle:
+    """Token bucket limiting how fast op messages reach the controller.
+
+    Up to ``burst`` messages go out at once, after which messages are let
+    through at ``rate`` per second. Messages that have to wait queue by
+    priority, then in arrival order. Once ``max_queue`` are waiting, a new
+    message is rejected unless it is more urgent than the last one in line,
+    which is rejected instead; a runaway automation thus cannot build an
+    unbounded backlog or lock out commands from the dashboard. A ``rate`` of
+    zero disables the limit.
+    """
+
+    def __init__(self, metrics, rate=5.0, burst=10, max_queue=20):
+        """Initialize."""
+        self.metrics = metrics
+        self.rate = rate
+        self.burst = burst
+        self.max_queue = max_queue
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        # Waiting (priority, sequence, future) entries
+        self._waiters = []
+        self._sequence = itertools.count()
+        self._wake_handle = None
+        self.max_depth = 0
+
+    @property
+    def depth(self):
+        """Return the number of messages waiting for a token."""
+        return len(self._waiters)
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, priority):
+        """Wait until a message of ``priority`` may be sent.
+
+        Returns False without waiting if the queue is full.
+        """
+        if self.rate <= 0:
+            return True
+        self._refill()
+        if not self._waiters and self._tokens >= 1:
+            self._tokens -= 1
+            return True
+        if len(self._waiters) >= self.max_queue and not self._evict(priority):
+            self.metrics.increment("op_dropped")
+            return False
+
+        self.metrics.increment("op_throttled")
+        future = asyncio.get_running_loop().create_future()
+        entry = (priority, next(self._sequence), future)
+        heapq.heappush(self._waiters, entry)
+        self.max_depth = max(self.max_depth, len(self._waiters))
+        self._schedule_wake()
+        start = time.perf_counter()
+        try:
+            granted = await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The token was handed over just as the caller gave up
+                self._tokens += 1
+            elif entry in self._waiters:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+            raise
+        if granted:
+            self.metrics.observe("throttle_wait", time.perf_counter() - start)
+        return granted
+
+    def _evict(self, priority):
+        """Reject the last waiter in line if it is less urgent than ``priority``."""
+        last = max(self._waiters)
+        if last[0] <= priority:
+            return False
+        self._waiters.remove(last)
+        heapq.heapify(self._waiters)
+        self.metrics.increment("op_dropped")
+        if not last[2].done():
+            last[2].set_result(False)
+        return True
+
+    def _schedule_wake(self):
+        """Arm a timer for when the next token becomes available."""
+        if self._wake_handle is not None or not self._waiters:
+            return
+        delay = max(0.0, (1 - self._tokens) / self.rate)
+        self._wake_handle = asyncio.get_running_loop().call_later(delay, self._wake)
+
+    def _wake(self):
+        """Hand available tokens to the most urgent waiters."""
+        self._wake_handle = None
+        self._refill()
+        while self._waiters and self._tokens >= 1:
+            _, _, future = heapq.heappop(self._waiters)
+            if future.done():
+                continue
+            self._tokens -= 1
+            future.set_result(True)
+        self._schedule_wake()
+
+    def as_dict(self):
+        """Return a JSON-serialisable snapshot of the throttle."""
+        self._refill()
+        return {
+            "rate_per_s": self.rate,
+            "burst": self.burst,
+            "tokens": round(self._tokens, 2),
+            "queue_depth": len(self._waiters),
+            "max_queue": self.max_queue,
+            "max_queue_depth": self.max_depth,
+        }
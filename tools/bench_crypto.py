@@ -0,0 +1,84 @@
+"""Micro-benchmark for Reiri payload crypto.
+
+Compares the original per-call ``Cipher``/``PKCS7`` implementation with the
+session cipher used by ``ReiriClient`` across a range of payload sizes.
+
+Usage: python tools/bench_crypto.py [--number N]
+"""
+import argparse
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from cryptography.hazmat.backends import default_backend  # noqa: E402
+from cryptography.hazmat.primitives import padding as sym_padding  # noqa: E402
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes  # noqa: E402
+
+from custom_components.reiri.crypto import SessionCipher  # noqa: E402
+
+KEY = bytes(range(16))
+SIZES = (1024, 16 * 1024, 128 * 1024, 1024 * 1024)
+
+
+def legacy_encrypt(plaintext):
+    cipher = Cipher(algorithms.AES(KEY), modes.CBC(KEY), backend=default_backend())
+    encryptor = cipher.encryptor()
+    padder = sym_padding.PKCS7(128).padder()
+    padded_data = padder.update(plaintext.encode("utf-8")) + padder.finalize()
+    ciphertext = encryptor.update(padded_data) + encryptor.finalize()
+    return ciphertext.hex()
+
+
+def legacy_decrypt_json(hex_ciphertext):
+    ciphertext = bytes.fromhex(hex_ciphertext)
+    cipher = Cipher(algorithms.AES(KEY), modes.CBC(KEY), backend=default_backend())
+    decryptor = cipher.decryptor()
+    padded_data = decryptor.update(ciphertext) + decryptor.finalize()
+    unpadder = sym_padding.PKCS7(128).unpadder()
+    plaintext = unpadder.update(padded_data) + unpadder.finalize()
+    return json.loads(plaintext.decode("utf-8"))
+
+
+def make_payload(size):
+    """Build a JSON document of roughly ``size`` bytes."""
+    filler = "x" * 64
+    doc = {}
+    i = 0
+    while len(json.dumps(doc)) < size:
+        doc[f"dtatcp1:1-{i:05d}"] = {"name": filler, "temp": 24.5}
+        i += 1
+    return json.dumps(doc, separators=(",", ":"))
+
+
+def bench(func, arg, number):
+    best = min(timeit.repeat(lambda: func(arg), number=number, repeat=5))
+    return best / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=50, help="calls per timing run")
+    args = parser.parse_args()
+
+    session = SessionCipher(KEY)
+    print(f"{'size':>9} {'op':<8} {'legacy us':>10} {'session us':>11} {'speed-up':>9}")
+    for size in SIZES:
+        plaintext = make_payload(size)
+        ciphertext = legacy_encrypt(plaintext)
+        assert session.encrypt(plaintext) == ciphertext
+        assert session.decrypt_json(ciphertext) == legacy_decrypt_json(ciphertext)
+
+        for name, legacy, current, arg in (
+            ("encrypt", legacy_encrypt, session.encrypt, plaintext),
+            ("decrypt", legacy_decrypt_json, session.decrypt_json, ciphertext),
+        ):
+            old = bench(legacy, arg, args.number)
+            new = bench(current, arg, args.number)
+            print(f"{size:>9} {name:<8} {old:>10.1f} {new:>11.1f} {old / new:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
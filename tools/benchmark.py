@@ -0,0 +1,255 @@
+"""Benchmark suite for the integration's hot paths.
+
+Runs offline against synthetic ``mplist`` payloads of 10, 100 and 1000 points
+and measures:
+
+- payload ``_encrypt``/``_decrypt`` on a ``ReiriClient`` session;
+- frame parsing (``decode_frame`` plus decrypt and JSON parse);
+- ``ReiriClimate._update_attrs`` for every point;
+- a coordinator refresh fanned out to one climate entity per point, with
+  every point changed and with 10% changed, including time and memory
+  allocated per refresh;
+- the handshake cost of unwrapping the common key.
+
+Results are compared with ``tools/bench_baseline.json``; the script exits
+with status 1 if any time or allocation figure exceeds its baseline by more
+than the tolerance. Timings are scaled by a fixed calibration workload run
+alongside the benchmarks, which absorbs most of the difference between
+machines and CPU load; regenerate the baseline with ``--update-baseline``
+after an intentional change.
+
+Usage: python tools/benchmark.py [--points 10 100 1000] [--tolerance 0.5]
+"""
+import argparse
+import asyncio
+import base64
+import gc
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from cryptography.hazmat.primitives import serialization  # noqa: E402
+from homeassistant.core import HomeAssistant  # noqa: E402
+
+from custom_components.reiri.climate import ReiriClimate  # noqa: E402
+from custom_components.reiri.codec import decode_frame, dumps, encode_frame  # noqa: E402
+from custom_components.reiri.coordinator import ReiriDataUpdateCoordinator  # noqa: E402
+from custom_components.reiri.crypto import RsaKeypair, SessionCipher, _OAEP_SHA1  # noqa: E402
+from custom_components.reiri.models import parse_points  # noqa: E402
+from custom_components.reiri.reiri_client import ReiriClient  # noqa: E402
+from mock_controller import make_points  # noqa: E402
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "bench_baseline.json")
+KEY = bytes(range(16))
+
+
+def _best_us(func, repeat=7, min_time=0.05):
+    """Return the best per-call time of ``func`` in microseconds.
+
+    The number of calls per run is raised until a run takes at least
+    ``min_time`` seconds, and garbage collection is paused while timing, as
+    ``timeit`` does.
+    """
+    gc.disable()
+    try:
+        number = 1
+        while True:
+            elapsed = _run(func, number)
+            if elapsed >= min_time:
+                break
+            number *= 2
+        best = elapsed
+        for _ in range(repeat - 1):
+            best = min(best, _run(func, number))
+    finally:
+        gc.enable()
+    return best / number * 1e6
+
+
+def _run(func, number):
+    start = time.perf_counter()
+    for _ in range(number):
+        func()
+    return time.perf_counter() - start
+
+
+def _calibration_us():
+    """Time a fixed pure-Python workload used to normalise the results."""
+    doc = {f"key{i}": {"value": i, "name": "x" * 16} for i in range(200)}
+
+    def workload():
+        json.loads(json.dumps(doc))
+        sorted(doc, key=lambda k: doc[k]["value"])
+
+    return _best_us(workload)
+
+
+def _allocated_kib(func, number):
+    """Return the memory allocated per call of ``func`` in KiB.
+
+    Measured as the peak traced memory while running, so short-lived
+    allocations count even though they are freed again.
+    """
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        for _ in range(number):
+            func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return (peak - base) / 1024
+
+
+def _variant(points, fraction, step):
+    """Return a copy of ``points`` with ``fraction`` of the units changed."""
+    every = max(1, round(1 / fraction))
+    variant = {}
+    for i, (point_id, raw) in enumerate(points.items()):
+        if i % every == 0:
+            raw = {**raw, "temp": raw["temp"] + 0.5 * step, "thermo": "on" if step % 2 else "off"}
+        variant[point_id] = raw
+    return variant
+
+
+def bench_crypto(results, size, points):
+    client = ReiriClient("127.0.0.1", "bench", "bench")
+    client._cipher = SessionCipher(KEY)
+    plaintext = dumps(points)
+    ciphertext = client._encrypt(plaintext)
+    frame = encode_frame("enc", "mplist", ciphertext)
+
+    results[f"encrypt_{size}_us"] = _best_us(lambda: client._encrypt(plaintext))
+    results[f"decrypt_{size}_us"] = _best_us(lambda: client._decrypt(ciphertext))
+
+    def parse_frame():
+        parsed = decode_frame(frame)
+        client._cipher.decrypt_json(parsed.payload)
+
+    results[f"parse_frame_{size}_us"] = _best_us(parse_frame)
+
+
+async def bench_entities(results, size, points):
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        client = ReiriClient("127.0.0.1", "bench", "bench")
+        coordinator = ReiriDataUpdateCoordinator(hass, client, "bench")
+        coordinator.data = points
+        coordinator.points = parse_points(points)
+
+        entities = []
+        for i, point_id in enumerate(points):
+            entity = ReiriClimate(coordinator, client, point_id)
+            entity.hass = hass
+            entity.entity_id = f"climate.bench_{i}"
+            coordinator.async_add_listener(entity._handle_coordinator_update)
+            entities.append(entity)
+
+        def update_attrs():
+            for entity in entities:
+                entity._update_attrs()
+
+        results[f"update_attrs_{size}_us"] = _best_us(update_attrs)
+
+        for label, fraction in (("all", 1.0), ("10pct", 0.1)):
+            variants = [_variant(points, fraction, step) for step in range(2)]
+            counter = iter(range(10**9))
+
+            def refresh():
+                coordinator.async_handle_push("mplist", variants[next(counter) % 2])
+
+            results[f"refresh_{label}_{size}_us"] = _best_us(refresh)
+            results[f"refresh_{label}_{size}_alloc_kib"] = _allocated_kib(refresh, 1)
+
+        # Drop timers scheduled by the coordinator and its stores
+        coordinator._async_unsub_refresh()
+        coordinator._snapshot_store._async_cleanup_delay_listener()
+        coordinator._runtime_store._async_cleanup_delay_listener()
+        await hass.async_stop(force=True)
+
+
+def bench_handshake(results):
+    keypair = RsaKeypair.generate()
+    public_key = serialization.load_pem_public_key(keypair.public_pem.encode("utf-8"))
+    wrapped = base64.b64encode(public_key.encrypt(KEY, _OAEP_SHA1)).decode("ascii")
+
+    def unwrap():
+        SessionCipher(keypair.decrypt_common_key(wrapped))
+
+    results["handshake_unwrap_us"] = _best_us(unwrap)
+
+
+def compare(results, baseline, tolerance):
+    """Print results against the baseline and return the names that regressed."""
+    regressions = []
+    print(f"{'benchmark':<34} {'current':>12} {'baseline':>12} {'change':>8}")
+    for name, value in results.items():
+        base = baseline.get(name)
+        if base is None:
+            print(f"{name:<34} {value:>12.1f} {'-':>12} {'new':>8}")
+            continue
+        change = (value - base) / base if base else 0.0
+        flag = ""
+        if value > base * (1 + tolerance):
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<34} {value:>12.1f} {base:>12.1f} {change:>+7.0%}{flag}")
+    return regressions
+
+
+async def main(args):
+    results = {}
+    calibration = _calibration_us()
+    for size in args.points:
+        points = make_points(size)
+        bench_crypto(results, size, points)
+        await bench_entities(results, size, points)
+    bench_handshake(results)
+    calibration = min(calibration, _calibration_us())
+
+    if args.update_baseline:
+        with open(BASELINE_PATH, "w", encoding="utf-8") as f:
+            json.dump(
+                {"calibration_us": round(calibration, 1)}
+                | {name: round(value, 1) for name, value in results.items()},
+                f,
+                indent=2,
+            )
+            f.write("\n")
+        print(f"Baseline written to {BASELINE_PATH}")
+        return 0
+
+    baseline = {}
+    if os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH, encoding="utf-8") as f:
+            baseline = json.load(f)
+    # Express timings as if measured on the baseline machine
+    scale = baseline.get("calibration_us", calibration) / calibration
+    print(f"calibration {calibration:.1f} us (scale {scale:.2f})")
+    for name in results:
+        if name.endswith("_us"):
+            results[name] *= scale
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f"{len(regressions)} benchmark(s) regressed by more than {args.tolerance:.0%}: "
+              f"{', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--points", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--tolerance", type=float, default=0.5,
+                        help="allowed slowdown over the baseline before failing (0.5 = 50%%)")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="store the results as the new baseline instead of comparing")
+    logging.basicConfig(level=logging.CRITICAL)
+    sys.exit(asyncio.run(main(parser.parse_args())))
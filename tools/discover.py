@@ -0,0 +1,63 @@
+"""Scan networks for Reiri controllers the way the config flow does.
+
+Probes every address of the given networks on the controller port and
+confirms each candidate with the ``sys_info`` handshake. Point it at the mock
+controller to try discovery locally:
+
+    python tools/mock_controller.py &
+    python tools/discover.py 127.0.0.1/30
+
+Without arguments the /24 networks of this machine's interfaces are scanned.
+
+Usage: python tools/discover.py [NETWORK ...] [--port 52001] [--timeout 1] [--concurrency 64]
+"""
+import argparse
+import asyncio
+import ipaddress
+import logging
+import os
+import socket
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from custom_components.reiri.const import (  # noqa: E402
+    DEFAULT_PORT,
+    DISCOVERY_CONCURRENCY,
+    DISCOVERY_TIMEOUT,
+)
+from custom_components.reiri.discovery import MAX_PREFIX, async_discover_hubs  # noqa: E402
+
+
+def _local_networks():
+    """Return the /24 around this machine's outbound IPv4 address."""
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        # No packet is sent; this only picks the interface for the route
+        sock.connect(("192.0.2.1", 9))
+        address = sock.getsockname()[0]
+    return [ipaddress.ip_network(f"{address}/{MAX_PREFIX}", strict=False)]
+
+
+async def main(args):
+    networks = args.networks or _local_networks()
+    start = time.perf_counter()
+    hubs = await async_discover_hubs(networks, args.port, args.timeout, args.concurrency)
+    elapsed = time.perf_counter() - start
+    for hub in hubs:
+        print(f"{hub.host}:{hub.port}  model {hub.model or '-'}")
+    print(f"Scanned {', '.join(map(str, networks))} in {elapsed:.1f}s, "
+          f"found {len(hubs)} controller(s)")
+    return 0 if hubs else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("networks", nargs="*", help="networks or addresses, e.g. 192.168.1.0/24")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--timeout", type=float, default=DISCOVERY_TIMEOUT,
+                        help="seconds to wait for each host")
+    parser.add_argument("--concurrency", type=int, default=DISCOVERY_CONCURRENCY,
+                        help="hosts probed at the same time")
+    logging.basicConfig(level=logging.WARNING)
+    sys.exit(asyncio.run(main(parser.parse_args())))
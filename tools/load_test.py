@@ -0,0 +1,85 @@
+"""Load test ReiriClient against the local mock controller.
+
+For each point count, measures mplist round trips, a burst of concurrent op
+commands, and recovery from a reconnect storm where the controller drops every
+connection several times in a row.
+
+Usage: python tools/load_test.py [--points 10 100 500] [--clients 4]
+"""
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from custom_components.reiri.reiri_client import ReiriClient  # noqa: E402
+from mock_controller import MockReiriController  # noqa: E402
+
+
+def _summary(samples):
+    samples = sorted(samples)
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    return f"median {statistics.median(samples) * 1000:7.1f} ms  p95 {p95 * 1000:7.1f} ms"
+
+
+async def _timed(coro):
+    start = time.perf_counter()
+    await coro
+    return time.perf_counter() - start
+
+
+async def run(point_count, clients, polls, storms, latency):
+    controller = MockReiriController(port=0, points=point_count, latency=latency)
+    await controller.start()
+    pool = [ReiriClient("127.0.0.1", controller.username, controller.password, controller.port)
+            for _ in range(clients)]
+    try:
+        connect_times = await asyncio.gather(*(_timed(c.ensure_connected()) for c in pool))
+        print(f"[{point_count} points] connect x{clients}: {_summary(connect_times)}")
+
+        poll_times = []
+        for _ in range(polls):
+            poll_times += await asyncio.gather(*(_timed(c.get_point_list()) for c in pool))
+        print(f"[{point_count} points] mplist x{len(poll_times)}: {_summary(poll_times)}")
+
+        client = pool[0]
+        point_ids = list(controller.points)
+        start = time.perf_counter()
+        await asyncio.gather(*(client.operate({pid: {"stat": "off"}}) for pid in point_ids))
+        print(f"[{point_count} points] op burst for every point: "
+              f"{(time.perf_counter() - start) * 1000:.1f} ms")
+
+        recovery = []
+        for _ in range(storms):
+            await controller.drop_all()
+            await asyncio.sleep(0)
+            recovery += await asyncio.gather(*(_timed(c.get_point_list()) for c in pool))
+        if recovery:
+            print(f"[{point_count} points] reconnect storm x{storms}: {_summary(recovery)}"
+                  f"  connections {controller.stats['connections']}")
+    finally:
+        await asyncio.gather(*(c.close() for c in pool))
+        await controller.stop()
+
+
+async def main(args):
+    latency = {}
+    if args.latency:
+        latency = {"mplist": args.latency, "op": args.latency}
+    for point_count in args.points:
+        await run(point_count, args.clients, args.polls, args.storms, latency)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--points", type=int, nargs="+", default=[10, 100, 500])
+    parser.add_argument("--clients", type=int, default=4, help="concurrent client connections")
+    parser.add_argument("--polls", type=int, default=20, help="mplist rounds per client")
+    parser.add_argument("--storms", type=int, default=3, help="forced disconnect rounds")
+    parser.add_argument("--latency", type=float, default=0.0, help="controller response delay (s)")
+    logging.basicConfig(level=logging.CRITICAL)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,346 @@
+"""Local mock Reiri controller for integration and load testing.
+
+Implements the controller side of the Reiri websocket protocol:
+
+- the plain ``sys_info`` handshake, answering the client's PKCS#1 public key
+  with an RSA-OAEP (SHA-1) wrapped AES ``common_key``;
+- AES-128-CBC ``enc`` framing, with the common key doubling as the IV;
+- the ``login``, ``mplist`` and ``op`` commands.
+
+Fault injection covers per-command latency, the controller's slow
+acknowledgement of commands (state changes only show up in ``mplist`` after
+``apply_delay`` seconds), dropped connections and unsolicited status frames.
+
+Only ``websockets`` and ``cryptography`` are required; the integration itself
+is not imported.
+
+Usage: python tools/mock_controller.py --points 100 --latency mplist=0.5
+"""
+import argparse
+import asyncio
+import base64
+import json
+import logging
+import os
+import random
+import time
+
+import websockets
+from cryptography.hazmat.backends import default_backend
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import padding as asym_padding
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+
+_LOGGER = logging.getLogger("mock_reiri")
+
+DEFAULT_PORT = 52001
+PUSH_COMMAND = "mpnotify"
+
+_OAEP_SHA1 = asym_padding.OAEP(
+    mgf=asym_padding.MGF1(algorithm=hashes.SHA1()),
+    algorithm=hashes.SHA1(),
+    label=None,
+)
+
+
+def make_points(count):
+    """Return ``count`` synthetic indoor unit points keyed by point id."""
+    points = {}
+    for i in range(count):
+        points[f"dtatcp1:1-{i:05d}"] = {
+            "name": f"Unit {i + 1}",
+            "stat": "on" if i % 3 else "off",
+            "mode": "CHF"[i % 3],
+            "sp": 22.0,
+            "csp": 24.0,
+            "hsp": 21.0,
+            "temp": 23.0 + (i % 7) * 0.5,
+            "otemp": 30,
+            "fanstep": "LMH"[i % 3],
+            "flap": "S",
+            "filter": "on" if i % 11 == 0 else "off",
+            "thermo": "on" if i % 2 else "off",
+            "mode_cap": {"C": 1, "H": 1, "F": 1, "D": 1, "A": 1},
+            "fanstep_cap": {"A": 1, "S": 3},
+            "flap_cap": {"D": 3},
+        }
+    return points
+
+
+class _Session:
+    """Per-connection protocol state."""
+
+    def __init__(self, controller, websocket):
+        self.controller = controller
+        self.websocket = websocket
+        self.cipher = None
+        self.logged_in = False
+        self.frames = 0
+
+    def encrypt(self, obj):
+        data = json.dumps(obj, separators=(",", ":")).encode("utf-8")
+        pad = 16 - len(data) % 16
+        encryptor = self.cipher.encryptor()
+        return (encryptor.update(data + bytes((pad,)) * pad) + encryptor.finalize()).hex()
+
+    def decrypt(self, hex_ciphertext):
+        decryptor = self.cipher.decryptor()
+        padded = decryptor.update(bytes.fromhex(hex_ciphertext)) + decryptor.finalize()
+        return json.loads(padded[:-padded[-1]])
+
+    async def send_enc(self, cmd, obj):
+        await self.websocket.send(json.dumps(["enc", None, [cmd, self.encrypt(obj)]]))
+
+
+class MockReiriController:
+    """Asyncio websocket server speaking the Reiri protocol."""
+
+    def __init__(
+        self,
+        host="127.0.0.1",
+        port=DEFAULT_PORT,
+        points=10,
+        username="admin",
+        password="password",
+        latency=None,
+        apply_delay=0.0,
+        drop_after=None,
+        push_interval=None,
+        drift_interval=None,
+    ):
+        """Initialize.
+
+        ``latency`` maps command names (``sys_info``, ``login``, ``mplist``,
+        ``op``) to response delays in seconds. ``apply_delay`` postpones the
+        effect of ``op`` commands on ``mplist`` data, mimicking the controller's
+        slow acknowledgement (about 60 s on real hardware). ``drop_after``
+        closes each connection after that many frames. ``push_interval`` sends
+        unsolicited status frames for recently changed points, and
+        ``drift_interval`` randomly nudges room temperatures.
+        """
+        self.host = host
+        self.port = port
+        self.points = make_points(points) if isinstance(points, int) else points
+        self.username = username
+        self.password = password
+        self.latency = dict(latency or {})
+        self.apply_delay = apply_delay
+        self.drop_after = drop_after
+        self.push_interval = push_interval
+        self.drift_interval = drift_interval
+
+        self.sessions = set()
+        self.stats = {"connections": 0, "drops": 0, "frames": 0}
+        self._server = None
+        self._tasks = set()
+        self._dirty = set()
+
+    async def start(self):
+        """Start listening. With ``port=0`` the bound port is stored on ``port``."""
+        self._server = await websockets.serve(self._handle, self.host, self.port)
+        self.port = next(iter(self._server.sockets)).getsockname()[1]
+        if self.push_interval:
+            self._spawn(self._push_loop())
+        if self.drift_interval:
+            self._spawn(self._drift_loop())
+        _LOGGER.info("Mock controller listening on ws://%s:%s/ with %d points",
+                     self.host, self.port, len(self.points))
+
+    async def stop(self):
+        """Stop the server and background tasks."""
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def drop_all(self):
+        """Close every open client connection, e.g. to trigger a reconnect storm."""
+        for session in list(self.sessions):
+            self.stats["drops"] += 1
+            await session.websocket.close()
+
+    async def push(self, point_ids=None):
+        """Send an unsolicited status frame for the given (or dirty) points."""
+        point_ids = set(point_ids) if point_ids is not None else self._dirty
+        if not point_ids:
+            return
+        update = {pid: self.points[pid] for pid in point_ids if pid in self.points}
+        self._dirty = set()
+        for session in list(self.sessions):
+            if session.logged_in:
+                try:
+                    await session.send_enc(PUSH_COMMAND, update)
+                except websockets.exceptions.ConnectionClosed:
+                    pass
+
+    def _spawn(self, coro):
+        task = asyncio.get_running_loop().create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def _delay(self, cmd):
+        delay = self.latency.get(cmd, 0)
+        if delay:
+            await asyncio.sleep(delay)
+
+    async def _handle(self, websocket, *_):
+        session = _Session(self, websocket)
+        self.sessions.add(session)
+        self.stats["connections"] += 1
+        try:
+            async for raw in websocket:
+                session.frames += 1
+                self.stats["frames"] += 1
+                if self.drop_after and session.frames > self.drop_after:
+                    self.stats["drops"] += 1
+                    await websocket.close()
+                    return
+                # Handle each request concurrently so per-command latency on
+                # one request does not hold up the others.
+                self._spawn(self._handle_frame(session, raw))
+        except websockets.exceptions.ConnectionClosed:
+            pass
+        finally:
+            self.sessions.discard(session)
+
+    async def _handle_frame(self, session, raw):
+        try:
+            data = json.loads(raw)
+            kind, _, body = data
+            cmd = body[0]
+            payload = body[1] if len(body) > 1 else None
+        except (ValueError, TypeError, IndexError):
+            _LOGGER.warning("Malformed frame: %s", raw[:200])
+            return
+
+        await self._delay(cmd)
+        try:
+            if cmd == "sys_info" and kind is None:
+                await self._handle_sys_info(session, payload)
+            elif kind != "enc" or session.cipher is None:
+                _LOGGER.warning("Unexpected %s frame before handshake", cmd)
+            elif cmd == "login":
+                await self._handle_login(session, session.decrypt(payload))
+            elif not session.logged_in:
+                await session.send_enc(cmd, {"result": "NG", "reason": "not logged in"})
+            elif cmd == "mplist":
+                await session.send_enc("mplist", self.points)
+            elif cmd == "op":
+                await self._handle_op(session, session.decrypt(payload))
+            else:
+                await session.send_enc(cmd, {"result": "NG", "reason": "unknown command"})
+        except websockets.exceptions.ConnectionClosed:
+            pass
+
+    async def _handle_sys_info(self, session, pem):
+        public_key = serialization.load_pem_public_key(pem.encode("utf-8"), backend=default_backend())
+        common_key = os.urandom(16)
+        session.cipher = Cipher(algorithms.AES(common_key), modes.CBC(common_key), backend=default_backend())
+        wrapped = base64.b64encode(public_key.encrypt(common_key, _OAEP_SHA1)).decode("ascii")
+        await session.websocket.send(json.dumps([None, None, ["sys_info", {"common_key": wrapped, "model": "mock"}]]))
+
+    async def _handle_login(self, session, creds):
+        ok = creds.get("name") == self.username and creds.get("passwd") == self.password
+        session.logged_in = ok
+        await session.send_enc("login", {"result": "OK" if ok else "NG"})
+
+    async def _handle_op(self, session, command):
+        results = {}
+        for point_id, attrs in command.items():
+            if point_id not in self.points or not isinstance(attrs, dict):
+                results[point_id] = "NG"
+                continue
+            results[point_id] = "OK"
+            if self.apply_delay:
+                loop = asyncio.get_running_loop()
+                loop.call_later(self.apply_delay, self._apply, point_id, attrs)
+            else:
+                self._apply(point_id, attrs)
+        await session.send_enc("op", {"result": "OK" if all(r == "OK" for r in results.values()) else "NG", **results})
+
+    def _apply(self, point_id, attrs):
+        point = self.points[point_id]
+        for key, value in attrs.items():
+            point[key] = value
+            if key == "sp":
+                if point.get("mode") == "C":
+                    point["csp"] = value
+                elif point.get("mode") == "H":
+                    point["hsp"] = value
+        self._dirty.add(point_id)
+
+    async def _push_loop(self):
+        while True:
+            await asyncio.sleep(self.push_interval)
+            await self.push()
+
+    async def _drift_loop(self):
+        while True:
+            await asyncio.sleep(self.drift_interval)
+            point_id = random.choice(list(self.points))
+            point = self.points[point_id]
+            point["temp"] = round(point["temp"] + random.choice((-0.5, 0.5)), 1)
+            point["thermo"] = random.choice(("on", "off"))
+            self._dirty.add(point_id)
+
+
+def _parse_latency(values):
+    latency = {}
+    for item in values or ():
+        cmd, _, seconds = item.partition("=")
+        latency[cmd] = float(seconds)
+    return latency
+
+
+async def _main(args):
+    controller = MockReiriController(
+        host=args.host,
+        port=args.port,
+        points=args.points,
+        username=args.username,
+        password=args.password,
+        latency=_parse_latency(args.latency),
+        apply_delay=args.apply_delay,
+        drop_after=args.drop_after,
+        push_interval=args.push_interval,
+        drift_interval=args.drift_interval,
+    )
+    await controller.start()
+    started = time.monotonic()
+    try:
+        while True:
+            await asyncio.sleep(30)
+            _LOGGER.info("Up %ds, stats: %s", time.monotonic() - started, controller.stats)
+    finally:
+        await controller.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--points", type=int, default=10, help="number of indoor units")
+    parser.add_argument("--username", default="admin")
+    parser.add_argument("--password", default="password")
+    parser.add_argument("--latency", action="append", metavar="CMD=SECONDS",
+                        help="response delay per command, e.g. op=60 (repeatable)")
+    parser.add_argument("--apply-delay", type=float, default=0.0,
+                        help="seconds before an op shows up in mplist (60 on real hardware)")
+    parser.add_argument("--drop-after", type=int, help="close each connection after N frames")
+    parser.add_argument("--push-interval", type=float, help="send unsolicited status frames every N seconds")
+    parser.add_argument("--drift-interval", type=float, help="randomly change a point every N seconds")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    try:
+        asyncio.run(_main(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
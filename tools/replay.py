@@ -0,0 +1,286 @@
+"""Replay a protocol capture through the client and coordinator.
+
+Captures are written by the ``reiri.start_capture`` service (see
+``custom_components/reiri/capture.py``). The replay serves them from a local
+controller built on the mock controller's handshake and encryption:
+
+- recorded ``mplist`` and ``op`` requests are re-issued at their recorded
+  times, through a coordinator refresh and ``ReiriClient.operate``, with
+  one climate entity per point listening as in Home Assistant;
+- each request is answered with the next recorded response for that command;
+- unsolicited frames are pushed at their recorded times.
+
+Handshakes and logins are not replayed; the client connects once at the
+start. With ``--speed 0`` every event waits for the previous one to finish,
+which makes runs repeatable; otherwise events are scheduled at the recorded
+times divided by the speed and may overlap as they did on the controller.
+
+Reports refresh, push and command latency and the CPU time used. With
+``--output`` the figures are saved; ``--compare`` prints them against an
+earlier run and exits with status 1 if any grew by more than the tolerance.
+
+Usage: python tools/replay.py CAPTURE [--speed 0] [--output after.json] [--compare before.json]
+"""
+import argparse
+import asyncio
+import collections
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from homeassistant.core import HomeAssistant  # noqa: E402
+
+from custom_components.reiri.capture import load_capture  # noqa: E402
+from custom_components.reiri.climate import ReiriClimate  # noqa: E402
+from custom_components.reiri.coordinator import ReiriDataUpdateCoordinator  # noqa: E402
+from custom_components.reiri.reiri_client import ReiriClient  # noqa: E402
+from benchmark import compare  # noqa: E402
+from mock_controller import MockReiriController  # noqa: E402
+
+_LOGGER = logging.getLogger("reiri_replay")
+
+# How long a push may take to reach the coordinator with --speed 0 (seconds)
+PUSH_WAIT_TIMEOUT = 5
+
+
+class ReplayController(MockReiriController):
+    """Controller answering requests from a capture instead of live state."""
+
+    def __init__(self, events):
+        """Initialize."""
+        super().__init__(port=0, points={}, username="replay", password="replay")
+        self.responses = collections.defaultdict(collections.deque)
+        for event in events:
+            _, direction, kind, cmd, payload = event[:5]
+            if direction == "in" and cmd not in ("sys_info", "login"):
+                self.responses[cmd].append((kind, payload))
+        self.unanswered = collections.Counter()
+        self._logged_in = []
+
+    async def _handle_frame(self, session, raw):
+        data = json.loads(raw)
+        kind, _, body = data
+        cmd = body[0]
+        if cmd == "sys_info" and kind is None:
+            await self._handle_sys_info(session, body[1])
+            return
+        if cmd == "login":
+            session.logged_in = True
+            self._logged_in.append(session)
+            await session.send_enc("login", {"result": "OK"})
+            return
+
+        queue = self.responses.get(cmd)
+        if not queue:
+            # The run asked for more than was recorded
+            self.unanswered[cmd] += 1
+            await session.send_enc(cmd, {"result": "OK"})
+            return
+        kind, payload = queue.popleft()
+        if kind == "enc":
+            await session.send_enc(cmd, payload)
+        else:
+            await session.websocket.send(json.dumps([kind, None, [cmd, payload]]))
+
+    async def push_frame(self, cmd, payload):
+        """Send a recorded unsolicited frame on the oldest open session."""
+        self._logged_in = [s for s in self._logged_in if s in self.sessions]
+        if self._logged_in:
+            await self._logged_in[0].send_enc(cmd, payload)
+
+
+def _summary_ms(samples):
+    """Return median, p95 and max of ``samples`` (seconds) in milliseconds."""
+    if not samples:
+        return {}
+    samples = sorted(samples)
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    return {
+        "median": statistics.median(samples) * 1000,
+        "p95": p95 * 1000,
+        "max": samples[-1] * 1000,
+    }
+
+
+class Replay:
+    """Drive a client and coordinator through the events of a capture."""
+
+    def __init__(self, hass, events, speed):
+        """Initialize."""
+        self.hass = hass
+        self.events = events
+        self.speed = speed
+        self.controller = ReplayController(events)
+        # Control session messages carry their channel name
+        self._dual_channel = any(len(event) > 5 for event in events)
+        self.client = None
+        self.coordinator = None
+        self.entities = []
+        self.samples = collections.defaultdict(list)
+        self._pushes = 0
+        self._tasks = set()
+
+    async def run(self):
+        """Replay every event and return the measurements."""
+        await self.controller.start()
+        self.client = ReiriClient(
+            "127.0.0.1",
+            self.controller.username,
+            self.controller.password,
+            self.controller.port,
+            dual_channel=self._dual_channel,
+        )
+        self.coordinator = ReiriDataUpdateCoordinator(self.hass, self.client, "replay")
+        # Polls are driven by the capture, not the coordinator's timer
+        self.coordinator._schedule_refresh = lambda: None
+        self.client.add_push_listener(self._handle_push)
+        try:
+            await self.client.ensure_connected()
+            loop = asyncio.get_running_loop()
+            cpu_start = time.process_time()
+            start = loop.time()
+            for event in self.events:
+                if self.speed:
+                    await asyncio.sleep(max(0, start + event[0] / self.speed - loop.time()))
+                await self._dispatch(event)
+            if self._tasks:
+                await asyncio.gather(*self._tasks, return_exceptions=True)
+            cpu = time.process_time() - cpu_start
+            wall = loop.time() - start
+        finally:
+            await self.client.close()
+            await self.controller.stop()
+            self.coordinator._snapshot_store._async_cleanup_delay_listener()
+            self.coordinator._runtime_store._async_cleanup_delay_listener()
+        return self._results(cpu, wall)
+
+    async def _dispatch(self, event):
+        _, direction, _, cmd, payload = event[:5]
+        if direction == "push":
+            self._pushes += 1
+            await self.controller.push_frame(cmd, payload)
+            if not self.speed:
+                await self._wait_for_pushes()
+            return
+        if direction != "out":
+            return
+        if cmd == "mplist":
+            job = self._timed("refresh", self._refresh())
+        elif cmd == "op" and isinstance(payload, dict):
+            job = self._timed("op", self.client.operate(payload))
+        else:
+            return
+        task = asyncio.get_running_loop().create_task(job)
+        if not self.speed:
+            await task
+            return
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _refresh(self):
+        await self.coordinator.async_refresh()
+        if not self.entities and self.coordinator.data:
+            self._add_entities()
+
+    async def _timed(self, name, coro):
+        start = time.perf_counter()
+        try:
+            await coro
+        except Exception as e:
+            _LOGGER.debug(f"Replayed {name} failed: {e}")
+            self.samples[f"{name}_errors"].append(1)
+            return
+        self.samples[name].append(time.perf_counter() - start)
+
+    def _handle_push(self, cmd, payload):
+        start = time.perf_counter()
+        self.coordinator.async_handle_push(cmd, payload)
+        self.samples["push"].append(time.perf_counter() - start)
+
+    async def _wait_for_pushes(self):
+        deadline = time.monotonic() + PUSH_WAIT_TIMEOUT
+        while self.client.metrics.counters.get("push_frames", 0) < self._pushes:
+            if time.monotonic() > deadline:
+                _LOGGER.warning("Pushed frame did not reach the client")
+                self._pushes = self.client.metrics.counters.get("push_frames", 0)
+                return
+            await asyncio.sleep(0.001)
+
+    def _add_entities(self):
+        """Attach one climate entity per point, as the climate platform does."""
+        for i, point_id in enumerate(self.coordinator.data):
+            entity = ReiriClimate(self.coordinator, self.client, point_id)
+            entity.hass = self.hass
+            entity.entity_id = f"climate.replay_{i}"
+            self.coordinator.async_add_listener(entity._handle_coordinator_update)
+            self.entities.append(entity)
+
+    def _results(self, cpu, wall):
+        results = {
+            "points": len(self.coordinator.data or {}),
+            "events": len(self.events),
+            "cpu_s": cpu,
+            "wall_s": wall,
+        }
+        for name in ("refresh", "push", "op"):
+            results[f"{name}_count"] = len(self.samples[name])
+            results[f"{name}_errors"] = len(self.samples[f"{name}_errors"])
+            for stat, value in _summary_ms(self.samples[name]).items():
+                results[f"{name}_{stat}_ms"] = value
+        results["unanswered"] = dict(self.controller.unanswered)
+        return results
+
+
+async def main(args):
+    _, events = load_capture(args.capture)
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        try:
+            results = await Replay(hass, events, args.speed).run()
+        finally:
+            await hass.async_stop(force=True)
+
+    for name, value in results.items():
+        print(f"{name:<24} {value:.3f}" if isinstance(value, float) else f"{name:<24} {value}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            before = json.load(f)
+        # Only timings and CPU are comparable between runs
+        measured = {
+            name: value for name, value in results.items()
+            if name == "cpu_s" or name.endswith("_ms")
+        }
+        print()
+        regressions = compare(measured, before, args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} figure(s) grew by more than {args.tolerance:.0%}: "
+                  f"{', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("capture", help="capture file written by reiri.start_capture")
+    parser.add_argument("--speed", type=float, default=0,
+                        help="replay speed relative to the recording; 0 runs events back to back")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="compare with results saved by an earlier run")
+    parser.add_argument("--tolerance", type=float, default=0.5,
+                        help="allowed growth over the earlier run before failing (0.5 = 50%%)")
+    logging.basicConfig(level=logging.WARNING)
+    # Entities are attached without a platform, which Home Assistant warns about
+    logging.getLogger("homeassistant.helpers.entity").setLevel(logging.ERROR)
+    sys.exit(asyncio.run(main(parser.parse_args())))